@@ -29,12 +29,15 @@ load
 
 __version__ = '0.19.1'
 
-from jedi.api import Script, Interpreter, set_debug_function, preload_module
+from jedi.api import Script, Interpreter, set_debug_function, preload_module, \
+    preload_modules
 from jedi import settings
 from jedi.api.environment import find_virtualenvs, find_system_environments, \
     get_default_environment, InvalidPythonEnvironment, create_environment, \
     get_system_environment, InterpreterEnvironment
 from jedi.api.project import Project, get_default_project
+from jedi.api.session import Session
+from jedi.api.async_script import AsyncScript
 from jedi.api.exceptions import InternalError, RefactoringError
 
 # Finally load the internal plugins. This is only internal.
@@ -60,6 +60,29 @@ def _complete():
         print(completions)
 
 
+def _preload():
+    """
+    Usage: python -m jedi preload [--processes N] [--path DIR]... [MODULE]...
+    """
+    import jedi
+
+    args = sys.argv[2:]
+    modules = []
+    paths = []
+    processes = None
+    while args:
+        arg = args.pop(0)
+        if arg == '--path':
+            paths.append(args.pop(0))
+        elif arg == '--processes':
+            processes = int(args.pop(0))
+        else:
+            modules.append(arg)
+
+    for name, error in jedi.preload_modules(modules, paths=paths, processes=processes):
+        print('%s: %s' % (name, error))
+
+
 if len(sys.argv) == 2 and sys.argv[1] == 'repl':
     # don't want to use __main__ only for repl yet, maybe we want to use it for
     # something else. So just use the keyword ``repl`` for now.
@@ -68,5 +91,7 @@ elif len(sys.argv) > 1 and sys.argv[1] == '_linter':
     _start_linter()
 elif len(sys.argv) > 1 and sys.argv[1] == '_complete':
     _complete()
+elif len(sys.argv) > 1 and sys.argv[1] == 'preload':
+    _preload()
 else:
     print('Command not implemented: %s' % sys.argv[1])
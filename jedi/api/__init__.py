@@ -7,7 +7,9 @@ Alternatively, if you don't need a custom function and are happy with printing
 debug messages to stdout, simply call :func:`set_debug_function` without
 arguments.
 """
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import parso
@@ -21,26 +23,29 @@ from jedi.file_io import KnownContentFileIO
 from jedi.api import classes
 from jedi.api import interpreter
 from jedi.api import helpers
-from jedi.api.helpers import validate_line_column
+from jedi.api import completion_cache
+from jedi.api.helpers import validate_line_column, stoppable, serialized
 from jedi.api.completion import Completion, search_in_module
 from jedi.api.keywords import KeywordName
-from jedi.api.environment import InterpreterEnvironment
+from jedi.api.environment import InterpreterEnvironment, create_environment
 from jedi.api.project import get_default_project, Project
 from jedi.api.errors import parso_to_jedi_errors
 from jedi.api import refactoring
 from jedi.api.refactoring.extract import extract_function, extract_variable
 from jedi.inference import InferenceState
 from jedi.inference import imports
-from jedi.inference.references import find_references
+from jedi.inference.references import iter_reference_batches, _IGNORE_FOLDERS
 from jedi.inference.arguments import try_iter_content
 from jedi.inference.helpers import infer_call_of_leaf
 from jedi.inference.sys_path import transform_path_to_dotted
 from jedi.inference.syntax_tree import tree_name_to_values
 from jedi.inference.value import ModuleValue
+from jedi.inference.compiled.value import prefetch_docstrings
 from jedi.inference.base_value import ValueSet
 from jedi.inference.value.iterable import unpack_tuple_to_dict
 from jedi.inference.gradual.conversion import convert_names, convert_values
 from jedi.inference.gradual.utils import load_proper_stub_module
+from jedi.inference.gradual.typeshed_index import STUB_GRAMMAR_VERSION
 from jedi.inference.utils import to_list
 
 # Jedi uses lots and lots of recursion. By setting this a little bit higher, we
@@ -96,8 +101,13 @@ class Script:
     :param Project project: Provide a :class:`.Project` to make sure finding
         references works well, because the right folder is searched. There are
         also ways to modify the sys path and other things.
+    :param Session session: Reuse the inference results of a
+        :class:`.Session` instead of starting from scratch. The project and
+        the environment of the session are used, so ``project`` and
+        ``environment`` must not be given.
     """
-    def __init__(self, code=None, *, path=None, environment=None, project=None):
+    def __init__(self, code=None, *, path=None, environment=None, project=None,
+                 session=None):
         self._orig_path = path
         if isinstance(path, str):
             path = Path(path)
@@ -112,22 +122,32 @@ class Script:
             with open(path, 'rb') as f:
                 code = f.read()
 
-        if project is None:
-            # Load the Python grammar of the current interpreter.
-            project = get_default_project(None if self.path is None else self.path.parent)
+        # Completions of a session reuse the names of the previous completion.
+        self._completion_session = session
+        if session is not None:
+            if project is not None or environment is not None:
+                raise ValueError("A session already defines project and environment")
+            self._inference_state = session._get_inference_state(self.path)
+        else:
+            if project is None:
+                # Load the Python grammar of the current interpreter.
+                project = get_default_project(None if self.path is None else self.path.parent)
 
-        self._inference_state = InferenceState(
-            project, environment=environment, script_path=self.path
-        )
+            self._inference_state = InferenceState(
+                project, environment=environment, script_path=self.path
+            )
         debug.speed('init')
-        self._module_node, code = self._inference_state.parse_and_get_code(
-            code=code,
-            path=self.path,
-            use_latest_grammar=path and path.suffix == '.pyi',
-            cache=False,  # No disk cache, because the current script often changes.
-            diff_cache=settings.fast_parser,
-            cache_path=settings.cache_directory,
-        )
+        # The diff parser changes the cached module of the path in place, while
+        # other scripts of a session might still be inferring it.
+        with self._inference_state.lock:
+            self._module_node, code = self._inference_state.parse_and_get_code(
+                code=code,
+                path=self.path,
+                use_latest_grammar=path and path.suffix == '.pyi',
+                cache=False,  # No disk cache, because the current script often changes.
+                diff_cache=settings.fast_parser,
+                cache_path=settings.cache_directory,
+            )
         debug.speed('parsed')
         self._code_lines = parso.split_lines(code, keepends=True)
         self._code = code
@@ -192,7 +212,8 @@ class Script:
         )
 
     @validate_line_column
-    def complete(self, line=None, column=None, *, fuzzy=False):
+    @stoppable
+    def complete(self, line=None, column=None, *, fuzzy=False, ranked=False):
         """
         Completes objects under the cursor.
 
@@ -201,20 +222,104 @@ class Script:
 
         :param fuzzy: Default False. Will return fuzzy completions, which means
             that e.g. ``ooa`` will match ``foobar``.
+        :param ranked: Default False. Sorts the completions by relevance
+            instead of by name: Better matches first, then names that are
+            defined close to the cursor, names that are used in many files of
+            the project (once the project was indexed by
+            :meth:`.Project.search` or :meth:`.Script.get_references`) and
+            names that fit the annotation of the parameter at the cursor.
+        :param should_stop: A callable without arguments. Once it returns
+            True, Jedi stops inferring and returns what it has found so far.
+            All the methods that infer (e.g. :meth:`.Script.infer`,
+            :meth:`.Script.goto` and :meth:`.Script.get_signatures`) accept
+            it. See :ref:`Cancellation <cancellation>`.
         :return: Completion objects, sorted by name. Normal names appear
             before "private" names that start with ``_`` and those appear
             before magic methods and name mangled names that start with ``__``.
         :rtype: list of :class:`.Completion`
         """
+        completions = self._complete(line, column, fuzzy, ranked)
+        self._load_completion_cache(completions)
+        return completions
+
+    @validate_line_column
+    @stoppable
+    def complete_page(self, line=None, column=None, *, fuzzy=False, ranked=False, start=0,
+                      count=50):
+        """
+        Like :meth:`.Script.complete`, but only returns ``count`` completions,
+        starting with the completion at index ``start``. Clients can show the
+        first page right away and only ask for more once they are needed.
+        Used together with a :class:`.Session`, the names at the position are
+        only inferred once for all pages.
+
+        :param fuzzy: Same as in :meth:`.Script.complete`.
+        :param ranked: Same as in :meth:`.Script.complete`. Together with
+            ``count`` this returns the ``count`` most relevant completions.
+        :param should_stop: Same as in :meth:`.Script.complete`.
+        :rtype: :class:`.CompletionPage`
+        """
+        completions = self._complete(line, column, fuzzy, ranked)
+        page = completions[start:start + count]
+        self._load_completion_cache(page)
+        return classes.CompletionPage(page, start, len(completions))
+
+    def _complete(self, line, column, fuzzy, ranked=False):
         self._inference_state.reset_recursion_limitations()
         with debug.increase_indent_cm('complete'):
+            session = self._completion_session
             completion = Completion(
                 self._inference_state, self._get_module_context(), self._code_lines,
                 (line, column), self.get_signatures, fuzzy=fuzzy,
+                previous_candidates=None if session is None else session._completion_candidates,
+                ranked=ranked,
             )
-            return completion.complete()
+            completions = completion.complete()
+            if session is not None and not self._inference_state.was_stopped:
+                session._completion_candidates = completion.candidates
+            return completions
+
+    def _load_completion_cache(self, completions):
+        # Make persisted types and docstrings of big modules available.
+        cached_names = {c._cached_name for c in completions} - {None}
+        for cached_name in cached_names:
+            completion_cache.load_module(self._inference_state, cached_name)
+
+    @stoppable
+    def resolve_completions(self, completions):
+        """
+        Resolves the details of many completions of this script at once,
+        instead of asking every :class:`.Completion` for its type, docstring
+        and signatures on its own. Completions of the same compiled object
+        (e.g. the completions of ``os.``) share a single call to the
+        subprocess for their docstrings. The details of modules like
+        ``numpy`` are cached across scripts, see
+        :data:`jedi.settings.completion_cache_limit`.
+
+        :param completions: Completions returned by this script.
+        :param should_stop: Same as in :meth:`.Script.complete`. The details
+            of the completions that were not resolved in time are None.
+        :rtype: list of :class:`.CompletionDetails`
+        """
+        self._load_completion_cache(completions)
+        prefetch_docstrings(c._name for c in completions if c._cached_name is None)
+        details = []
+        for completion in completions:
+            if not self._inference_state.is_stopped():
+                detail = classes.CompletionDetails(
+                    completion.type,
+                    completion.docstring(),
+                    completion.get_signatures(),
+                )
+                # Details that were resolved while stopping might be partial.
+                if not self._inference_state.was_stopped:
+                    details.append(detail)
+                    continue
+            details.append(None)
+        return details
 
     @validate_line_column
+    @stoppable
     def infer(self, line=None, column=None, *, only_stubs=False, prefer_stubs=False):
         self._inference_state.reset_recursion_limitations()
         """
@@ -260,6 +365,7 @@ class Script:
         return helpers.sorted_definitions(set(defs))
 
     @validate_line_column
+    @stoppable
     def goto(self, line=None, column=None, *, follow_imports=False, follow_builtin_imports=False,
              only_stubs=False, prefer_stubs=False):
         self._inference_state.reset_recursion_limitations()
@@ -311,6 +417,7 @@ class Script:
         # Avoid duplicates
         return list(set(helpers.sorted_definitions(defs)))
 
+    @serialized
     def search(self, string, *, all_scopes=False):
         """
         Searches a name in the current file. For a description of how the
@@ -338,6 +445,7 @@ class Script:
             fuzzy=fuzzy,
         )
 
+    @serialized
     def complete_search(self, string, **kwargs):
         """
         Like :meth:`.Script.search`, but completes that string. If you want to
@@ -354,6 +462,7 @@ class Script:
         return self._search_func(string, complete=True, **kwargs)
 
     @validate_line_column
+    @stoppable
     def help(self, line=None, column=None):
         """
         Used to display a help window to users.  Uses :meth:`.Script.goto` and
@@ -410,25 +519,63 @@ class Script:
             the current module only.
         :rtype: list of :class:`.Name`
         """
-        self._inference_state.reset_recursion_limitations()
+        return helpers.sorted_definitions(self._iter_references(line, column, **kwargs))
 
-        def _references(include_builtins=True, scope='project'):
-            if scope not in ('project', 'file'):
-                raise ValueError('Only the scopes "file" and "project" are allowed')
-            tree_name = self._module_node.get_name_of_position((line, column))
-            if tree_name is None:
-                # Must be syntax
-                return []
-
-            names = find_references(self._get_module_context(), tree_name, scope == 'file')
-
-            definitions = [classes.Name(self._inference_state, n) for n in names]
-            if not include_builtins or scope == 'file':
-                definitions = [d for d in definitions if not d.in_builtin_module()]
-            return helpers.sorted_definitions(definitions)
-        return _references(**kwargs)
+    @validate_line_column
+    def iter_references(self, line=None, column=None, **kwargs):
+        """
+        Like :meth:`.Script.get_references`, but yields the references as soon
+        as they are found instead of returning a sorted list once all of them
+        are known. This makes it possible to show the first results while the
+        rest of the project is still being searched.
+
+        The search stops when the iterator is closed or when ``should_stop``
+        returns True.
+
+        :param include_builtins: Same as in :meth:`.Script.get_references`.
+        :param scope: Same as in :meth:`.Script.get_references`.
+        :param should_stop: A callable without arguments that is checked
+            regularly, e.g. ``threading.Event().is_set``.
+        :rtype: iterator of :class:`.Name`
+        """
+        return self._iter_references(line, column, **kwargs)
+
+    def _iter_references(self, line, column, include_builtins=True, scope='project',
+                         should_stop=None):
+        if scope not in ('project', 'file'):
+            raise ValueError('Only the scopes "file" and "project" are allowed')
+
+        def iterate():
+            # The lock is only held while a module is searched and not while
+            # the consumer handles the references, because other calls of a
+            # session would have to wait for that as well.
+            with helpers.api_call(self, should_stop):
+                self._inference_state.reset_recursion_limitations()
+                tree_name = self._module_node.get_name_of_position((line, column))
+                if tree_name is None:
+                    # Must be syntax
+                    return
+                batches = iter_reference_batches(
+                    self._get_module_context(),
+                    tree_name,
+                    scope == 'file',
+                    should_stop=self._inference_state.is_stopped,
+                )
+            while True:
+                with helpers.api_call(self, should_stop):
+                    names = next(batches, None)
+                    if names is None:
+                        return
+                    definitions = [classes.Name(self._inference_state, n) for n in names]
+                    definitions = [
+                        d for d in definitions
+                        if include_builtins and scope != 'file' or not d.in_builtin_module()
+                    ]
+                yield from definitions
+        return iterate()
 
     @validate_line_column
+    @stoppable
     def get_signatures(self, line=None, column=None):
         """
         Return the function object of the call under the cursor.
@@ -467,6 +614,7 @@ class Script:
                 for signature in definitions.get_signatures()]
 
     @validate_line_column
+    @serialized
     def get_context(self, line=None, column=None):
         """
         Returns the scope context under the cursor. This basically means the
@@ -507,6 +655,7 @@ class Script:
             definition = definition.parent()
         return definition
 
+    @serialized
     def _analysis(self):
         self._inference_state.is_analysis = True
         self._inference_state.analysis_modules = [self._module_node]
@@ -541,6 +690,7 @@ class Script:
         finally:
             self._inference_state.is_analysis = False
 
+    @serialized
     def get_names(self, **kwargs):
         """
         Returns names defined in the current file.
@@ -556,6 +706,7 @@ class Script:
         names = self._names(**kwargs)
         return [classes.Name(self._inference_state, n) for n in names]
 
+    @serialized
     def get_syntax_errors(self):
         """
         Lists all syntax errors in the current file.
@@ -579,6 +730,7 @@ class Script:
         ]
         return sorted(defs, key=lambda x: x.start_pos)
 
+    @serialized
     def rename(self, line=None, column=None, *, new_name):
         """
         Renames all references of the variable under the cursor.
@@ -592,6 +744,7 @@ class Script:
         return refactoring.rename(self._inference_state, definitions, new_name)
 
     @validate_line_column
+    @serialized
     def extract_variable(self, line, column, *, new_name, until_line=None, until_column=None):
         """
         Moves an expression to a new statement.
@@ -631,6 +784,7 @@ class Script:
         )
 
     @validate_line_column
+    @serialized
     def extract_function(self, line, column, *, new_name, until_line=None, until_column=None):
         """
         Moves an expression to a new function.
@@ -677,6 +831,7 @@ class Script:
             new_name, (line, column), until_pos
         )
 
+    @serialized
     def inline(self, line=None, column=None):
         """
         Inlines a variable under the cursor. This is basically the opposite of
@@ -728,19 +883,30 @@ class Interpreter(Script):
         except Exception:
             raise TypeError("namespaces must be a non-empty list of dicts.")
 
-        environment = kwds.get('environment', None)
-        if environment is None:
-            environment = InterpreterEnvironment()
+        session = kwds.get('session')
+        if session is not None:
+            if not isinstance(session._environment, InterpreterEnvironment):
+                raise TypeError("The environment of the session needs to be an "
+                                "InterpreterEnvironment subclass.")
+            super().__init__(code, project=project, **kwds)
         else:
-            if not isinstance(environment, InterpreterEnvironment):
-                raise TypeError("The environment needs to be an InterpreterEnvironment subclass.")
+            environment = kwds.get('environment', None)
+            if environment is None:
+                environment = InterpreterEnvironment()
+            else:
+                if not isinstance(environment, InterpreterEnvironment):
+                    raise TypeError("The environment needs to be an "
+                                    "InterpreterEnvironment subclass.")
 
-        if project is None:
-            project = Project(Path.cwd())
+            if project is None:
+                project = Project(Path.cwd())
 
-        super().__init__(code, environment=environment, project=project, **kwds)
+            super().__init__(code, environment=environment, project=project, **kwds)
 
         self.namespaces = namespaces
+        # The objects in the namespaces might have changed since the last
+        # completion.
+        self._completion_session = None
         self._inference_state.allow_unsafe_executions = \
             settings.allow_unsafe_interpreter_executions
         # Dynamic params search is important when we work on functions that are
@@ -783,6 +949,100 @@ def preload_module(*modules):
         Script(s).complete(1, len(s))
 
 
+def _iter_python_files(folder):
+    for root, dirnames, filenames in os.walk(folder):
+        dirnames[:] = [d for d in dirnames if d not in _IGNORE_FOLDERS]
+        for filename in filenames:
+            if filename.endswith(('.py', '.pyi')):
+                yield os.path.join(root, filename)
+
+
+_preload_executable = None
+_preload_environment = None
+
+
+def _init_preload_worker(executable, cache_directory):
+    global _preload_executable
+    settings.cache_directory = cache_directory
+    _preload_executable = executable
+
+
+def _get_preload_environment():
+    # Created once per worker and only if a module is preloaded, because
+    # parsing files only needs the grammar.
+    global _preload_environment
+    if _preload_environment is None and _preload_executable is not None:
+        _preload_environment = create_environment(_preload_executable, safe=False)
+    return _preload_environment
+
+
+def _preload_worker(job):
+    kind, string, grammar_version = job
+    try:
+        if kind == 'file':
+            grammar = parso.load_grammar(version=grammar_version)
+            grammar.parse(path=string, cache=True, cache_path=settings.cache_directory)
+        else:
+            s = "import %s as x; x." % string
+            for c in Script(s, environment=_get_preload_environment()).complete(1, len(s)):
+                if c._cached_name is not None:
+                    # Fill the persistent completion cache.
+                    c.type
+                    c.docstring()
+            completion_cache.flush()
+    except Exception as e:
+        return string, repr(e)
+    return string, None
+
+
+def preload_modules(modules=(), *, paths=(), environment=None, processes=None):
+    """
+    Like :func:`preload_module`, but for a lot of modules at once. The work is
+    distributed on a pool of processes and the results are written to the
+    caches in :data:`jedi.settings.cache_directory`. This makes it possible to
+    create a warm cache ahead of time, e.g. when building a container image.
+
+    :param modules: Names of modules that are imported and completed (like
+        with :func:`preload_module`).
+    :param paths: Folders (e.g. a ``site-packages`` folder) or files. All
+        Python files in there are parsed and written to the parser cache.
+    :param Environment environment: The environment the modules belong to,
+        by default the default environment is used.
+    :param int processes: The amount of processes, defaults to the amount of
+        CPUs.
+    :returns: A list of ``(module_name_or_path, error)`` for everything that
+        could not be preloaded.
+    """
+    if environment is None:
+        executable = grammar_version = None
+    else:
+        executable = environment.executable
+        grammar_version = '%s.%s' % environment.version_info[:2]
+    jobs = []
+    for path in paths:
+        path = os.path.abspath(path)
+        if os.path.isdir(path):
+            files = _iter_python_files(path)
+        else:
+            files = [path]
+        # Stubs are parsed with the same grammar as when they are loaded,
+        # otherwise the cached trees are not used.
+        jobs += [
+            ('file', f, STUB_GRAMMAR_VERSION if f.endswith('.pyi') else grammar_version)
+            for f in files
+        ]
+    jobs += [('module', m, None) for m in modules]
+
+    debug.dbg('Preloading %s modules and files', len(jobs))
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_preload_worker,
+                             initargs=(executable, settings.cache_directory)) as executor:
+        results = executor.map(_preload_worker, jobs, chunksize=16)
+        errors = [(string, error) for string, error in results if error is not None]
+    for string, error in errors:
+        debug.warning('Could not preload %s: %s', string, error)
+    return errors
+
+
 def set_debug_function(func_cb=debug.print_to_stdout, warnings=True,
                        notices=True, speed=True):
     """
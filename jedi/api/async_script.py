@@ -0,0 +1,131 @@
+"""
+Language servers and other asyncio based tools cannot call :class:`.Script`
+directly, because inference blocks the event loop. :class:`.AsyncScript` runs
+the parsing and inference of a script in an executor and can be awaited
+instead.
+
+Cancelling the awaiting task (e.g. because the editor cancelled the request)
+raises :class:`asyncio.CancelledError` as usual and tells the worker thread to
+stop inferring, see :ref:`cancellation <cancellation>`.
+
+Example usage::
+
+    script = jedi.AsyncScript(code, path=path, session=session)
+    completions = await script.complete(line, column)
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from jedi.api import Script
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_default_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(thread_name_prefix='jedi')
+        return _executor
+
+
+class AsyncScript:
+    """
+    An awaitable version of :class:`.Script`. It accepts the same arguments
+    and its methods return the same results.
+
+    Scripts that share a :class:`.Session` are executed one after the other,
+    all others run in parallel.
+
+    :param executor: The :class:`concurrent.futures.Executor` the work is done
+        in. Needs to run in the same process, so only thread pools work. By
+        default a thread pool that is shared by all async scripts is used.
+    """
+    def __init__(self, code=None, *, path=None, environment=None, project=None,
+                 session=None, executor=None):
+        self._create_script = partial(
+            Script, code, path=path, environment=environment,
+            project=project, session=session,
+        )
+        self._executor = executor
+        self._script_future = None
+
+    async def _run(self, method_name, *args, should_stop=None, **kwargs):
+        loop = asyncio.get_running_loop()
+        executor = self._executor or _get_default_executor()
+        if self._script_future is None:
+            self._script_future = loop.run_in_executor(executor, self._create_script)
+        # A cancelled call must not cancel the script of other calls.
+        script = await asyncio.shield(self._script_future)
+
+        cancelled = threading.Event()
+        if should_stop is None:
+            stop = cancelled.is_set
+        else:
+            def stop():
+                return cancelled.is_set() or should_stop()
+
+        method = getattr(script, method_name)
+        future = loop.run_in_executor(
+            executor,
+            partial(method, *args, should_stop=stop, **kwargs),
+        )
+        try:
+            return await future
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def complete(self, line=None, column=None, **kwargs):
+        """
+        See :meth:`.Script.complete`.
+        """
+        return await self._run('complete', line, column, **kwargs)
+
+    async def complete_page(self, line=None, column=None, **kwargs):
+        """
+        See :meth:`.Script.complete_page`.
+        """
+        return await self._run('complete_page', line, column, **kwargs)
+
+    async def resolve_completions(self, completions):
+        """
+        See :meth:`.Script.resolve_completions`.
+        """
+        return await self._run('resolve_completions', completions)
+
+    async def infer(self, line=None, column=None, **kwargs):
+        """
+        See :meth:`.Script.infer`.
+        """
+        return await self._run('infer', line, column, **kwargs)
+
+    async def goto(self, line=None, column=None, **kwargs):
+        """
+        See :meth:`.Script.goto`.
+        """
+        return await self._run('goto', line, column, **kwargs)
+
+    async def help(self, line=None, column=None):
+        """
+        See :meth:`.Script.help`.
+        """
+        return await self._run('help', line, column)
+
+    async def get_signatures(self, line=None, column=None):
+        """
+        See :meth:`.Script.get_signatures`.
+        """
+        return await self._run('get_signatures', line, column)
+
+    async def get_references(self, line=None, column=None, **kwargs):
+        """
+        See :meth:`.Script.get_references`.
+        """
+        return await self._run('get_references', line, column, **kwargs)
+
+    def __repr__(self):
+        return '<%s>' % self.__class__.__name__
@@ -4,6 +4,8 @@ There are a couple of classes documented in here:
 - :class:`.BaseName` as an abstact base class for almost everything.
 - :class:`.Name` used in a lot of places
 - :class:`.Completion` for completions
+- :class:`.CompletionPage` and :class:`.CompletionDetails` for
+  :meth:`.Script.complete_page` and :meth:`.Script.resolve_completions`
 - :class:`.BaseSignature` as a base class for signatures
 - :class:`.Signature` for :meth:`.Script.get_signatures` only
 - :class:`.ParamName` used for parameters of signatures
@@ -14,6 +16,7 @@ These classes are the much biggest part of the API, because they contain
 the interesting information about all operations.
 """
 import re
+from collections import namedtuple
 from pathlib import Path
 from typing import Optional
 from parso.tree import search_ancestor
@@ -456,6 +459,43 @@ class Completion(BaseName):
     def __repr__(self):
         return '<%s: %s>' % (type(self).__name__, self._name.get_public_name())
 
+
+class CompletionPage:
+    """
+    ``CompletionPage`` objects are returned from :meth:`.Script.complete_page`.
+    They contain a slice of all the completions at a position, in the same
+    order as :meth:`.Script.complete` returns them.
+    """
+
+    def __init__(self, completions, start, total):
+        self.completions = completions
+        """The :class:`.Completion` objects of this page."""
+        self.start = start
+        """The index of the first completion of this page."""
+        self.total = total
+        """The number of completions of all pages."""
+
+    @property
+    def has_more(self):
+        """
+        Whether there are completions after this page.
+        """
+        return self.start + len(self.completions) < self.total
+
+    def __repr__(self):
+        return '<%s: %s-%s of %s>' % (
+            type(self).__name__, self.start, self.start + len(self.completions), self.total)
+
+
+# Returned by ``Script.resolve_completions``.
+CompletionDetails = namedtuple('CompletionDetails', 'type docstring signatures')
+CompletionDetails.__doc__ = """
+The details of a :class:`.Completion` that need inference: ``type`` is
+:attr:`.Completion.type`, ``docstring`` is :meth:`.Completion.docstring` and
+``signatures`` is :meth:`.Completion.get_signatures`.
+"""
+
+
 class Name(BaseName):
     """
     *Name* objects are returned from many different APIs including
@@ -1,4 +1,5 @@
 import re
+from collections import namedtuple
 from textwrap import dedent
 from inspect import Parameter
 from parso.python.token import PythonTokenTypes
@@ -20,12 +21,19 @@ from jedi.inference.value import TreeInstance
 from jedi.inference.docstring_utils import DocstringModule
 from jedi.inference.names import ParamNameWrapper, SubModuleName
 from jedi.inference.gradual.conversion import convert_values, convert_names
-from jedi.parser_utils import cut_value_at_position
+from jedi.parser_utils import cut_value_at_position, get_parent_scope
 from jedi.plugins import plugin_manager
 
 class ParamNameWithEquals(ParamNameWrapper):
     pass
 
+
+# The unfiltered names of a completion. ``key`` is the code without the name
+# that is being completed and the position where that name starts.
+CompletionCandidates = namedtuple(
+    'CompletionCandidates', 'key like_name cached_name names stack')
+
+
 def get_user_context(module_context, position):
     """
     Returns the scope in which the user resides. This includes flows.
@@ -34,7 +42,8 @@ def get_user_context(module_context, position):
 
 class Completion:
 
-    def __init__(self, inference_state, module_context, code_lines, position, signatures_callback, fuzzy=False):
+    def __init__(self, inference_state, module_context, code_lines, position, signatures_callback,
+                 fuzzy=False, previous_candidates=None, ranked=False):
         self._inference_state = inference_state
         self._module_context = module_context
         self._module_node = module_context.tree_node
@@ -43,6 +52,155 @@ class Completion:
         self._original_position = position
         self._signatures_callback = signatures_callback
         self._fuzzy = fuzzy
+        self._previous_candidates = previous_candidates
+        self._ranked = ranked
+        # Set by ``complete`` if the candidates can be reused by the next
+        # completion, see ``_get_candidates``.
+        self.candidates = None
+
+    def complete(self):
+        leaf = self._module_node.get_leaf_for_position(
+            self._original_position,
+            include_prefixes=True
+        )
+        string, start_leaf, quote = _extract_string_while_in_string(leaf, self._original_position)
+        prefixed_completions = complete_dict(
+            self._module_context,
+            self._code_lines,
+            start_leaf or leaf,
+            self._original_position,
+            None if string is None else quote + string,
+            fuzzy=self._fuzzy,
+        )
+        if string is not None and (not prefixed_completions):
+            prefixed_completions = list(complete_file_name(
+                self._inference_state, self._module_context, start_leaf, quote, string,
+                self._like_name, self._signatures_callback,
+                self._code_lines, self._original_position,
+                self._fuzzy
+            ))
+        if string is not None:
+            if not prefixed_completions and '\n' in string:
+                prefixed_completions = self._complete_in_string(start_leaf, string)
+            return prefixed_completions
+        if prefixed_completions:
+            cached_name, completion_names = self._complete_python(leaf)
+        else:
+            cached_name, completion_names = self._get_candidates(leaf)
+        completions = list(filter_names(self._inference_state, completion_names,
+                                        self.stack, self._like_name,
+                                        self._fuzzy, cached_name=cached_name))
+        if self._ranked:
+            completions = self._rank(completions)
+        else:
+            completions.sort(key=lambda x: (x.name.startswith('__'),
+                                            x.name.startswith('_'),
+                                            x.name.lower()))
+        # Removing duplicates mostly to remove False/True/None duplicates.
+        return _remove_duplicates(prefixed_completions, completions) + completions
+
+    def _rank(self, completions):
+        """
+        Sorts the completions by relevance: How well they match, how close to
+        the cursor they are defined, how often they appear in the project and
+        whether they fit the type of the parameter that is being written.
+        """
+        from jedi.inference.symbol_index import get_loaded_symbol_index
+        like_name = self._like_name
+        if settings.case_insensitive_completion:
+            like_name = like_name.lower()
+        # Only an index that already exists is used, updating it means
+        # walking the whole project.
+        index = get_loaded_symbol_index(self._inference_state.project.path)
+
+        def key(completion):
+            name = completion.name
+            string = name.lower() if settings.case_insensitive_completion else name
+            if string.startswith(like_name):
+                match_rank = (0, not name.startswith(self._like_name), 0)
+            else:
+                match_rank = (1, True, _get_fuzzy_span(string, like_name))
+            file_count = 0 if index is None else index.count_paths_containing(name)
+            return (
+                match_rank,
+                self._get_scope_distance(completion._name),
+                -file_count,
+                name.startswith('__'),
+                name.startswith('_'),
+                len(name),
+                name.lower(),
+            )
+
+        decorated = sorted(((key(c), c) for c in completions), key=lambda pair: pair[0])
+        completions = [c for _, c in decorated]
+        # Inferring the signatures and the types of completions is expensive,
+        # so it's only done if there is something to rank and only the best
+        # completions are checked.
+        expected_types = self._get_expected_types() if completions else None
+        if expected_types:
+            best = decorated[:_TYPE_CHECK_LIMIT]
+            best.sort(key=lambda pair: (
+                pair[0][0],
+                not _has_type(pair[1]._name, expected_types),
+            ))
+            completions[:_TYPE_CHECK_LIMIT] = [c for _, c in best]
+        return completions
+
+    def _get_scope_distance(self, name):
+        """
+        0 for names of the scope the cursor is in, 1 for other names of the
+        same module and 2 for names of other modules.
+        """
+        tree_name = name.tree_name
+        if tree_name is None or tree_name.get_root_node() is not self._module_node:
+            return 2
+        scope = get_parent_scope(tree_name)
+        if scope.type == 'file_input':
+            return 1
+        return 0 if scope.start_pos <= self._original_position < scope.end_pos else 1
+
+    def _get_expected_types(self):
+        """
+        The names of the types that the parameter at the cursor is annotated
+        with, e.g. ``{'int', 'NoneType'}`` for ``Optional[int]``.
+        """
+        expected_types = set()
+        for signature in self._signatures_callback(*self._original_position):
+            index = signature.index
+            if index is None:
+                continue
+            for annotation in signature.params[index].infer_annotation():
+                expected_types.add(annotation.name)
+        return expected_types
+
+    def _get_candidates(self, leaf):
+        """
+        While typing a name, e.g. ``foo.ba`` and then ``foo.bar``, the names
+        that are possible at the position don't change, only the filtering.
+        The unfiltered names of the previous completion are therefore reused
+        if only the name that is completed was extended since then.
+        """
+        line, column = self._original_position
+        start_column = column - len(self._like_name)
+        code_line = self._code_lines[line - 1]
+        code = ''.join(
+            self._code_lines[:line - 1]
+            + [code_line[:start_column] + code_line[column:]]
+            + self._code_lines[line:]
+        )
+        key = (code, line, start_column)
+        previous = self._previous_candidates
+        if previous is not None and previous.key == key \
+                and self._like_name.startswith(previous.like_name):
+            debug.dbg('Reusing the completion candidates of %r', previous.like_name)
+            self.stack = previous.stack
+            self.candidates = previous
+            return (previous.cached_name, previous.names)
+        cached_name, completion_names = self._complete_python(leaf)
+        completion_names = list(completion_names)
+        self.candidates = CompletionCandidates(
+            key, self._like_name, cached_name, completion_names, self.stack)
+        return (cached_name, completion_names)
 
     def _complete_python(self, leaf):
         """
@@ -78,6 +236,30 @@ class Completion:
         """
         pass
 _string_start = re.compile('^\\w*(\\\'{3}|"{3}|\\\'|")')
+_TYPE_CHECK_LIMIT = 30
+
+def _get_fuzzy_span(string, like_name):
+    """
+    The distance between the first and the last matched character of a fuzzy
+    match. Smaller spans are better matches.
+    """
+    positions = []
+    start = 0
+    for character in like_name:
+        start = string.find(character, start)
+        if start == -1:
+            return len(string)
+        positions.append(start)
+        start += 1
+    if not positions:
+        return 0
+    return positions[-1] - positions[0]
+
+def _has_type(name, expected_types):
+    for value in name.infer():
+        if value.api_type == 'instance' and value.py__class__().name.string_name in expected_types:
+            return True
+    return False
 
 def _complete_getattr(user_context, instance):
     """
@@ -1,7 +1,204 @@
-from typing import Dict, Tuple, Callable
+"""
+Completions on big modules like ``numpy`` need the type, the docstring
+signature and the docstring of hundreds of names. These are cached per module
+and name.
+
+Only these three values are cached, and only for the names of the modules
+that completions mark with a cached name (``numpy``, ``tensorflow``,
+``matplotlib`` and ``pandas``). The names of a module and their signatures
+are still inferred for every completion.
+
+The cache is also persisted in :data:`jedi.settings.cache_directory`, so it
+survives a restart. A module's entries are only reused if the path,
+modification time and content hash of the module as well as the environment
+are still the same.
+
+The cache is shared by all scripts and threads and therefore protected by a
+lock. Its size is limited by :data:`jedi.settings.completion_cache_limit`.
+Changed entries are written to disk when their module is removed from memory
+and when the process exits.
+"""
+import atexit
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+from threading import RLock
+from typing import Dict, Tuple, Callable, Optional, Set
+
+from jedi import debug
+from jedi import settings
+from jedi._compatibility import pickle_dump, pickle_load
+from jedi.inference.cache import inference_state_function_cache
+
 CacheValues = Tuple[str, str, str]
 CacheValuesCallback = Callable[[], CacheValues]
-_cache: Dict[str, Dict[str, CacheValues]] = {}
+# (path, modification time, sha256 of the content, executable, python version)
+ModuleKey = Tuple[Optional[str], Optional[float], Optional[str], str, str]
+
+_VERSION = 1
+_PICKLE_PROTOCOL = 4
+
+# Least recently used modules first.
+_cache: 'OrderedDict[str, Dict[str, CacheValues]]' = OrderedDict()
+_module_keys: Dict[str, ModuleKey] = {}
+_changed_modules: Set[str] = set()
+# (path, modification time, size) -> sha256 of the content
+_content_hashes: Dict[Tuple[str, float, int], str] = {}
+_lock = RLock()
+
+
+def save_entry(module_name: str, name: str, cache: CacheValues) -> None:
+    with _lock:
+        try:
+            module_cache = _cache[module_name]
+        except KeyError:
+            module_cache = _cache[module_name] = {}
+        _cache.move_to_end(module_name)
+        module_cache[name] = cache
+        if module_name in _module_keys:
+            _changed_modules.add(module_name)
+        _limit_size()
+
+
+def _limit_size() -> None:
+    """
+    Removes the least recently used modules, until there are not more than
+    :data:`jedi.settings.completion_cache_limit` entries. Changed entries are
+    written to disk first, so they can be loaded again.
+    """
+    limit = settings.completion_cache_limit
+    if limit is None:
+        return
+    size = sum(len(entries) for entries in _cache.values())
+    # The most recently used module is always kept.
+    while size > limit and len(_cache) > 1:
+        module_name, entries = _cache.popitem(last=False)
+        _flush_module(module_name, entries)
+        _module_keys.pop(module_name, None)
+        size -= len(entries)
+        debug.dbg('Removed %s completion cache entries of %s', len(entries), module_name)
+
+
+def _create_get_from_cache(number: int) -> Callable[..., str]:
+    def _get_from_cache(module_name: str, name: str, get_cache_values: CacheValuesCallback,
+                        inference_state=None) -> str:
+        try:
+            with _lock:
+                value = _cache[module_name][name][number]
+                _cache.move_to_end(module_name)
+            return value
+        except KeyError:
+            v = get_cache_values()
+            # The values of a stopped inference might be partial, they would
+            # otherwise be used by later calls and be written to disk.
+            if inference_state is None or not inference_state.was_stopped:
+                save_entry(module_name, name, v)
+            return v[number]
+    return _get_from_cache
+
+
 get_type = _create_get_from_cache(0)
 get_docstring_signature = _create_get_from_cache(1)
-get_docstring = _create_get_from_cache(2)
\ No newline at end of file
+get_docstring = _create_get_from_cache(2)
+
+
+@inference_state_function_cache()
+def _get_module_path(inference_state, module_name: str):
+    for module in inference_state.import_module((module_name,)):
+        return True, module.py__file__()
+    return False, None
+
+
+def _get_content_hash(path: str, mtime: float, size: int) -> str:
+    key = path, mtime, size
+    try:
+        return _content_hashes[key]
+    except KeyError:
+        with open(path, 'rb') as f:
+            content_hash = _content_hashes[key] = hashlib.sha256(f.read()).hexdigest()
+        return content_hash
+
+
+def _get_module_key(inference_state, module_name: str) -> Optional[ModuleKey]:
+    environment = inference_state.environment
+    environment_key = (
+        environment.executable,
+        '.'.join(str(x) for x in environment.version_info),
+    )
+    found, path = _get_module_path(inference_state, module_name)
+    if not found:
+        return None
+    if path is None:
+        # Builtin modules only change together with the environment.
+        return (None, None, None) + environment_key
+    # The file is only read again if it looks changed.
+    try:
+        stat = os.stat(path)
+        content_hash = _get_content_hash(str(path), stat.st_mtime, stat.st_size)
+    except OSError:
+        return None
+    return (str(path), stat.st_mtime, content_hash) + environment_key
+
+
+def _get_cache_path(module_name: str, key: ModuleKey) -> Path:
+    environment_hash = hashlib.sha256(repr(key[3:]).encode('utf-8')).hexdigest()[:16]
+    return Path(settings.cache_directory).joinpath(
+        'completion-%s' % _VERSION,
+        environment_hash,
+        module_name + '.pickle',
+    )
+
+
+def load_module(inference_state, module_name: str) -> None:
+    """
+    Loads the persisted entries of a module, if they are still valid. This
+    needs to happen before the entries of ``module_name`` are used.
+    """
+    key = _get_module_key(inference_state, module_name)
+    with _lock:
+        if key is None or _module_keys.get(module_name) == key:
+            return
+
+        _module_keys[module_name] = key
+        _cache[module_name] = {}
+        _cache.move_to_end(module_name)
+        try:
+            with open(_get_cache_path(module_name, key), 'rb') as f:
+                version, saved_key, entries = pickle_load(f)
+        except (OSError, EOFError, ValueError) as e:
+            debug.dbg('No completion cache for %s: %r', module_name, e)
+            return
+        if version == _VERSION and saved_key == key:
+            _cache[module_name] = entries
+            debug.dbg('Loaded %s cached completion entries of %s', len(entries), module_name)
+            _limit_size()
+
+
+def _flush_module(module_name: str, entries: Dict[str, CacheValues]) -> None:
+    if module_name not in _changed_modules:
+        return
+    _changed_modules.discard(module_name)
+    key = _module_keys[module_name]
+    path = _get_cache_path(module_name, key)
+    tmp_path = path.with_suffix('.tmp%s' % os.getpid())
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle_dump((_VERSION, key, entries), f, _PICKLE_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        debug.warning('Could not write the completion cache of %s: %r', module_name, e)
+
+
+def flush() -> None:
+    """
+    Writes the entries of all modules that changed since the last flush to
+    disk.
+    """
+    with _lock:
+        for module_name in list(_changed_modules):
+            _flush_module(module_name, _cache[module_name])
+
+
+atexit.register(flush)
@@ -6,8 +6,11 @@ import os
 import sys
 import hashlib
 import filecmp
+import weakref
 from collections import namedtuple
 from shutil import which
+from threading import Lock
+from jedi import settings
 from jedi.cache import memoize_method, time_cache
 from jedi.inference.compiled.subprocess import CompiledSubprocess, InferenceStateSameProcess, InferenceStateSubprocess
 import parso
@@ -33,6 +36,8 @@ class Environment(_BaseEnvironment):
     functions instead. It is then returned by that function.
     """
     _subprocess = None
+    _pool = ()
+    _pool_users = None
 
     def __init__(self, executable, env_vars=None):
         self._start_executable = executable
@@ -43,6 +48,41 @@ class Environment(_BaseEnvironment):
         version = '.'.join((str(i) for i in self.version_info))
         return '<%s: %s in %s>' % (self.__class__.__name__, version, self.path)
 
+    def get_inference_state_subprocess(self, inference_state):
+        with _pool_lock:
+            compiled_subprocess = self._get_pooled_subprocess()
+            inference_state_subprocess = InferenceStateSubprocess(
+                inference_state,
+                compiled_subprocess,
+            )
+            self._pool_users[inference_state_subprocess] = compiled_subprocess
+        return inference_state_subprocess
+
+    def _get_pooled_subprocess(self):
+        """
+        Returns the subprocess of the pool that serves the fewest inference
+        states. An inference state stays with its subprocess for its whole
+        lifetime, because its access handles only exist in that process.
+
+        The size of the pool is :data:`jedi.settings.compiled_subprocess_count`.
+        """
+        if self._pool_users is None:
+            self._pool_users = weakref.WeakKeyDictionary()
+        self._pool = [self._get_subprocess()] + [
+            s for s in self._pool[1:] if not s.is_crashed
+        ]
+        if len(self._pool) < settings.compiled_subprocess_count:
+            compiled_subprocess = CompiledSubprocess(
+                self._start_executable,
+                env_vars=self._env_vars,
+            )
+            self._pool.append(compiled_subprocess)
+            # A new subprocess is by definition the least used one.
+            return compiled_subprocess
+
+        users = list(self._pool_users.values())
+        return min(self._pool, key=users.count)
+
     @memoize_method
     def get_sys_path(self):
         """
@@ -53,6 +93,9 @@ class Environment(_BaseEnvironment):
         """
         pass
 
+_pool_lock = Lock()
+
+
 class _SameEnvironmentMixin:
 
     def __init__(self):
@@ -1,8 +1,10 @@
 """
 Helpers for the API
 """
+import os
 import re
 from collections import namedtuple
+from contextlib import contextmanager
 from textwrap import dedent
 from itertools import chain
 from functools import wraps
@@ -13,7 +15,7 @@ from jedi.inference.base_value import NO_VALUES
 from jedi.inference.syntax_tree import infer_atom
 from jedi.inference.helpers import infer_call_of_leaf
 from jedi.inference.compiled import get_string_value_set
-from jedi.cache import signature_time_cache, memoize_method
+from jedi.inference.cache import record_dependencies
 from jedi.parser_utils import get_parent_scope
 CompletionParts = namedtuple('CompletionParts', ['path', 'has_dot', 'name'])
 
@@ -39,14 +41,109 @@ def _get_index_and_key(nodes, position):
     """
     pass
 
-@signature_time_cache('call_signatures_validity')
 def cache_signatures(inference_state, context, bracket_leaf, code_lines, user_pos):
-    """This function calculates the cache key."""
-    pass
+    """
+    Infers the callee of a call. Signature help is requested for every
+    keystroke while the arguments are typed, so the callee is cached by the
+    module, the position of the bracket and the code of the callee expression
+    (e.g. ``foo.bar``). A cached callee is used as long as the code outside of
+    the arguments that are being typed and the other modules that were used
+    to infer it don't change.
+    """
+    callee_leaf = bracket_leaf.get_previous_leaf()
+    module_path = context.get_root_context().py__file__()
+    if module_path is None:
+        # Don't cache, e.g. for the Interpreter.
+        return infer(inference_state, context, callee_leaf)
+
+    # The bracket doesn't move while the arguments are typed. It's part of the
+    # key, because the same callee code can mean different things in
+    # different scopes.
+    key = (module_path, bracket_leaf.start_pos, _get_callee_code(bracket_leaf))
+    version = _get_code_outside_of_arguments(code_lines, bracket_leaf.end_pos, user_pos)
+    signature_cache = inference_state.signature_cache
+    cached = signature_cache.get(key)
+    if cached is not None:
+        cached_version, paths, file_versions, values = cached
+        if cached_version == version and file_versions == _get_file_versions(paths):
+            return values
+
+    with record_dependencies(inference_state) as paths:
+        values = infer(inference_state, context, callee_leaf)
+    if not inference_state.was_stopped:
+        # Aliases and re-exports along the way count as well, not only the
+        # modules of the values.
+        paths |= {v.get_root_context().py__file__() for v in values}
+        paths -= {module_path, None}
+        signature_cache[key] = (version, paths, _get_file_versions(paths), values)
+    return values
+
+def _get_callee_code(bracket_leaf):
+    trailer = bracket_leaf.parent
+    if trailer.type != 'trailer':
+        return bracket_leaf.get_previous_leaf().value
+    children = trailer.parent.children
+    first, *rest = children[:children.index(trailer)]
+    return first.get_code(include_prefix=False) + ''.join(c.get_code() for c in rest)
+
+def _get_code_outside_of_arguments(code_lines, bracket_end, user_pos):
+    line, column = bracket_end
+    user_line, user_column = user_pos
+    return ''.join(code_lines[:line - 1] + [code_lines[line - 1][:column]]
+                   + [code_lines[user_line - 1][user_column:]] + code_lines[user_line:])
+
+def _get_file_versions(paths):
+    """
+    The modification times of the files at ``paths``.
+    """
+    versions = set()
+    for path in paths:
+        try:
+            versions.add((path, os.path.getmtime(path)))
+        except OSError:
+            versions.add((path, None))
+    return frozenset(versions)
 
 def get_module_names(module, all_scopes, definitions=True, references=False):
     """
     Returns a dictionary with name parts as keys and their call paths as
     values.
     """
-    pass
\ No newline at end of file
+    pass
+
+@contextmanager
+def api_call(script, should_stop=None):
+    """
+    Everything an API call does with the inference state of ``script``,
+    including the setup of the inference, happens within this context. Calls
+    on the same inference state (e.g. of a :class:`.Session`) from different
+    threads are serialised.
+    """
+    inference_state = script._inference_state
+    with inference_state.lock, inference_state.api_call(), \
+            inference_state.stop_when(should_stop):
+        # Other scripts of a session might have changed it in the meantime.
+        inference_state.set_script_path(script.path)
+        yield
+
+def stoppable(func):
+    """
+    Adds the ``should_stop`` keyword argument to an API method, see
+    :meth:`.InferenceState.stop_when`. The method runs within
+    :func:`api_call`.
+    """
+    @wraps(func)
+    def wrapper(self, *args, should_stop=None, **kwargs):
+        with api_call(self, should_stop):
+            return func(self, *args, **kwargs)
+    return wrapper
+
+def serialized(func):
+    """
+    Runs an API method that cannot be stopped within :func:`api_call`.
+    """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with api_call(self):
+            return func(self, *args, **kwargs)
+    return wrapper
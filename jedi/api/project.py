@@ -18,8 +18,8 @@ from jedi.api.helpers import split_search_string, get_module_names
 from jedi.inference.imports import load_module_from_path, load_namespace_from_path, iter_module_names
 from jedi.inference.sys_path import discover_buildout_paths
 from jedi.inference.cache import inference_state_as_method_param_cache
-from jedi.inference.references import recurse_find_python_folders_and_files, search_in_file_ios
-from jedi.file_io import FolderIO
+from jedi.inference.symbol_index import get_symbol_index, get_rank
+from jedi.file_io import FolderIO, FileIO
 _CONFIG_FOLDER = '.jedi'
 _CONTAINS_POTENTIAL_PROJECT = ('setup.py', '.git', '.hg', 'requirements.txt', 'MANIFEST.in', 'pyproject.toml')
 _SERIALIZER_VERSION = 1
@@ -118,7 +118,108 @@ class Project:
         """
         pass
 
-    def search(self, string, *, all_scopes=False):
+    def _search_func(self, string, complete=False, all_scopes=False, fuzzy=False,
+                     should_stop=None):
+        # Using a Script is they easiest way to get an empty module context.
+        from jedi import Script
+        s = Script('', project=self)
+        inference_state = s._inference_state
+        empty_module_context = s._get_module_context()
+
+        debug.dbg('Search for string %s, complete=%s', string, complete)
+        wanted_type, wanted_names = split_search_string(string)
+        name = wanted_names[0]
+        stub_folder_name = name + '-stubs'
+
+        index = get_symbol_index(inference_state, self._path)
+
+        # 1. Search for modules in the current project
+        module_contexts = []
+        folders = set()
+        for path in map(Path, index.paths):
+            if path.name in (name + '.py', name + '.pyi'):
+                module_contexts.append(
+                    load_module_from_path(inference_state, FileIO(str(path))).as_context()
+                )
+            folders |= {
+                folder for folder in path.parents
+                if folder.name in (name, stub_folder_name) and self._path in folder.parents
+            }
+        for folder in sorted(folders):
+            folder_io = FolderIO(str(folder))
+            try:
+                m = load_module_from_path(inference_state, folder_io.get_file_io('__init__.py'))
+            except FileNotFoundError:
+                try:
+                    m = load_module_from_path(inference_state,
+                                              folder_io.get_file_io('__init__.pyi'))
+                except FileNotFoundError:
+                    m = load_namespace_from_path(inference_state, folder_io)
+            module_contexts.append(m.as_context())
+
+        for m in module_contexts:
+            if should_stop is not None and should_stop():
+                return
+            debug.dbg('Search of a specific module %s', m)
+            yield from search_in_module(
+                inference_state,
+                m,
+                names=[m.name],
+                wanted_type=wanted_type,
+                wanted_names=wanted_names,
+                complete=complete,
+                convert=True,
+                ignore_imports=True,
+            )
+
+        # 2. Search for identifiers in the project. Only the files that define
+        #    a matching name according to the index are parsed, the files with
+        #    the best matches first.
+        matches = index.find(name, complete=complete, fuzzy=fuzzy, all_scopes=all_scopes)
+        found = []
+        for path in dict.fromkeys(m.path for m in matches):
+            if should_stop is not None and should_stop():
+                break
+            module_context = load_module_from_path(inference_state, FileIO(path)).as_context()
+            names = get_module_names(module_context.tree_node, all_scopes=all_scopes)
+            names = [module_context.create_name(n) for n in names]
+            names = _remove_imports(names)
+            found += search_in_module(
+                inference_state,
+                module_context,
+                names=names,
+                wanted_type=wanted_type,
+                wanted_names=wanted_names,
+                complete=complete,
+                fuzzy=fuzzy,
+                ignore_imports=True,
+            )
+        # The best matches of all files first, like the index ranks them.
+        like_name = wanted_names[-1].lower()
+        found.sort(key=lambda definition: get_rank(definition.name, like_name))
+        yield from found
+
+        # 3. Search for modules on sys.path
+        if should_stop is not None and should_stop():
+            return
+        sys_path = [
+            p for p in self._get_sys_path(inference_state)
+            # Exclude the current folder which is handled by the index.
+            if p != self._path
+        ]
+        names = list(iter_module_names(inference_state, empty_module_context, sys_path))
+        yield from search_in_module(
+            inference_state,
+            empty_module_context,
+            names=names,
+            wanted_type=wanted_type,
+            wanted_names=wanted_names,
+            complete=complete,
+            fuzzy=fuzzy,
+            convert=True,
+        )
+
+    def search(self, string, *, all_scopes=False, should_stop=None):
         """
         Searches a name in the whole project. If the project is very big,
         at some point Jedi will stop searching. However it's also very much
@@ -137,9 +238,12 @@ class Project:
         :param bool all_scopes: Default False; searches not only for
             definitions on the top level of a module level, but also in
             functions and classes.
+        :param should_stop: A callable without arguments that is checked
+            before every searched module. The search ends once it returns
+            True. Closing the generator works as well.
         :yields: :class:`.Name`
         """
-        pass
+        return self._search_func(string, all_scopes=all_scopes, should_stop=should_stop)
 
     def complete_search(self, string, **kwargs):
         """
@@ -149,13 +253,23 @@ class Project:
         :param bool all_scopes: Default False; searches not only for
             definitions on the top level of a module level, but also in
             functions and classes.
+        :param fuzzy: Default False. Will return fuzzy completions, which means
+            that e.g. ``ooa`` will match ``foobar``. Better matches (exact
+            matches, then prefixes, then substrings) come first.
+        :param should_stop: Same as in :meth:`.Project.search`.
         :yields: :class:`.Completion`
         """
-        pass
+        return self._search_func(string, complete=True, **kwargs)
 
     def __repr__(self):
         return '<%s: %s>' % (self.__class__.__name__, self._path)
 
+def _remove_imports(names):
+    return [
+        n for n in names
+        if n.tree_name is None or n.api_type not in ('module', 'namespace')
+    ]
+
 def _is_django_path(directory):
     """ Detects the path of the very well known Django library (if used) """
     pass
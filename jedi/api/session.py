@@ -0,0 +1,137 @@
+"""
+Sessions make it possible to reuse inference results across multiple
+:class:`.Script` and :class:`.Interpreter` instances. Creating a ``Script``
+normally creates a completely new inference state, which means that modules
+like ``builtins``, ``typing`` or big third party libraries have to be loaded
+again for every single request. A :class:`.Session` keeps this work alive.
+
+Example usage::
+
+    session = jedi.Session(jedi.Project('/path/to/project'))
+    jedi.Script(code, path='/path/to/project/foo.py', session=session).complete()
+    # After /path/to/project/bar.py has been modified:
+    session.invalidate('/path/to/project/bar.py')
+
+Only the results that depend on a changed file are thrown away, everything
+else (e.g. inference results of ``builtins``) is kept.
+
+Completions of a session are incremental: While a name is being typed (e.g.
+``foo.ba`` and then ``foo.bar``), the names that are possible at that position
+are only inferred once and filtered again for every keystroke.
+
+A session may be used from multiple threads. Calls of scripts that share a
+session are executed one after the other though, use multiple sessions to
+infer in parallel.
+
+If the subprocess that inspects compiled modules crashes, the session starts
+from scratch with the next script.
+
+.. warning:: A session caches results for all modules that are not the
+    script itself. It is the job of the user of a session to call
+    :meth:`.Session.invalidate` once a file changes, otherwise outdated
+    results might be returned.
+"""
+from pathlib import Path
+from threading import Lock
+
+from jedi import debug
+from jedi.api.project import get_default_project
+from jedi.inference import InferenceState
+from jedi.inference import symbol_index
+
+
+class Session:
+    """
+    A session is tied to a :class:`.Project` and an :ref:`Environment
+    <environments>` and can be passed to :class:`.Script` and
+    :class:`.Interpreter` with the ``session`` parameter.
+
+    :param Project project: The project that is used for all scripts of this
+        session. By default the project is searched in the current working
+        directory.
+    :param Environment environment: Provide a predefined :ref:`Environment
+        <environments>` to work with a specific Python version or virtualenv.
+    """
+    def __init__(self, project=None, *, environment=None):
+        if project is None:
+            project = get_default_project()
+        self._project = project
+        self._environment = environment
+        self._inference_state = None
+        self._lock = Lock()
+        # See ``Completion._get_candidates``.
+        self._completion_candidates = None
+
+    @property
+    def project(self):
+        """
+        The project of this session.
+        """
+        return self._project
+
+    def _get_inference_state(self, script_path=None):
+        with self._lock:
+            inference_state = self._inference_state
+            if inference_state is not None and inference_state.compiled_subprocess.is_crashed:
+                # All the compiled objects of the inference state are gone.
+                debug.warning('The subprocess of the session has crashed, starting over')
+                self._completion_candidates = None
+                inference_state = None
+            if inference_state is None:
+                inference_state = self._inference_state = InferenceState(
+                    self._project,
+                    environment=self._environment,
+                    script_path=script_path,
+                )
+                return inference_state
+
+        with inference_state.lock:
+            inference_state.set_script_path(script_path)
+            if script_path is not None:
+                # The script itself has most likely changed.
+                inference_state.invalidate_path(script_path)
+        return inference_state
+
+    def invalidate(self, path):
+        """
+        Removes all the cached information of a file. Call this once a file
+        was changed, created or deleted. Project searches and references then
+        also notice the change right away, instead of with the next walk of
+        the project, which happens at most every few seconds.
+
+        :param path: The path of the file that changed.
+        :type path: str or pathlib.Path
+        """
+        path = Path(path).absolute()
+        # Makes searches and references aware of the change right away.
+        symbol_index.invalidate_path(path)
+        if self._inference_state is None:
+            return
+        debug.dbg('Invalidate session cache for %s', path)
+        with self._inference_state.lock:
+            self._inference_state.invalidate_path(path)
+            self._completion_candidates = None
+
+    def get_cache_sizes(self):
+        """
+        Returns the amount of cached entries per category (``'memoize'``,
+        ``'module'``, ``'stub_module'``, ``'compiled'``, ``'mixed'`` and
+        ``'access'``). The total is limited by
+        :data:`jedi.settings.inference_cache_limit`.
+
+        :rtype: Dict[str, int]
+        """
+        if self._inference_state is None:
+            return {}
+        return self._inference_state.get_cache_sizes()
+
+    def clear(self):
+        """
+        Throws away all cached information of this session. The next script
+        starts from scratch.
+        """
+        self._inference_state = None
+        self._completion_candidates = None
+
+    def __repr__(self):
+        return '<%s: %s>' % (self.__class__.__name__, self._project)
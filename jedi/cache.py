@@ -6,17 +6,37 @@ available:
 - ``time_cache`` can be used to cache something for just a limited time span,
   which can be useful if there's user interaction and the user cannot react
   faster than a certain time.
+- ``LRUCache`` keeps a limited number of entries and throws away the least
+  recently used ones first.
 
-This module is one of the reasons why |jedi| is not thread-safe. As you can see
-there are global variables, which are holding the cache information. Some of
-these variables are being cleaned after every API usage.
+These caches are global variables that are shared by all threads, which is why
+they are protected by locks. Some of these variables are being cleaned after
+every API usage.
 """
+import os
 import time
+from collections import OrderedDict
 from functools import wraps
-from typing import Any, Dict, Tuple
-from jedi import settings
+from threading import RLock
+from weakref import WeakSet
 from parso.cache import parser_cache
-_time_caches: Dict[str, Dict[Any, Tuple[float, Any]]] = {}
+_lru_caches: 'WeakSet[LRUCache]' = WeakSet()
+_parser_locks = {}  # Dict[str, RLock]
+_parser_locks_lock = RLock()
+
+def get_parser_lock(path):
+    """
+    parso's parser cache is global as well. Syntax trees that are cached for a
+    path may be changed by the diff parser, so parsing the same path is
+    serialised, while different paths are parsed in parallel.
+    """
+    path = os.fspath(path)
+    with _parser_locks_lock:
+        try:
+            return _parser_locks[path]
+        except KeyError:
+            lock = _parser_locks[path] = RLock()
+            return lock
 
 def clear_time_caches(delete_all: bool=False) -> None:
     """ Jedi caches many things, that should be completed after each completion
@@ -25,19 +45,86 @@ def clear_time_caches(delete_all: bool=False) -> None:
     :param delete_all: Deletes also the cache that is normally not deleted,
         like parser cache, which is important for faster parsing.
     """
-    pass
+    if delete_all:
+        for cache in list(_lru_caches):
+            cache.clear()
+        parser_cache.clear()
 
-def signature_time_cache(time_add_setting):
+class LRUCache:
     """
-    This decorator works as follows: Call it with a setting and after that
-    use the function with a callable that returns the key.
-    But: This function is only called if the key is not available. After a
-    certain amount of time (`time_add_setting`) the cache is invalid.
-
-    If the given key is None, the function will not be cached.
+    A mapping that keeps at most ``maxsize`` entries. If there are more, the
+    least recently used entries are removed.
     """
-    pass
+
+    def __init__(self, maxsize):
+        self._maxsize = maxsize
+        self._dict = OrderedDict()
+        self._lock = RLock()
+        _lru_caches.add(self)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._dict[key]
+            except KeyError:
+                return default
+            self._dict.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._dict[key] = value
+            self._dict.move_to_end(key)
+            while len(self._dict) > self._maxsize:
+                self._dict.popitem(last=False)
+
+    def __len__(self):
+        return len(self._dict)
+
+    def clear(self):
+        with self._lock:
+            self._dict.clear()
+
+def time_cache(seconds):
+    def decorator(func):
+        cache = {}
+        lock = RLock()
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, frozenset(kwargs.items()))
+            with lock:
+                try:
+                    created, result = cache[key]
+                    if time.time() < created + seconds:
+                        return result
+                except KeyError:
+                    pass
+            # Not called within the lock, other keys don't have to wait.
+            result = func(*args, **kwargs)
+            with lock:
+                cache[key] = time.time(), result
+            return result
+
+        def clear_cache():
+            with lock:
+                cache.clear()
+
+        wrapper.clear_cache = clear_cache
+        return wrapper
+    return decorator
 
 def memoize_method(method):
     """A normal memoize function."""
-    pass
\ No newline at end of file
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache_dict = self.__dict__.setdefault('_memoize_method_dct', {})
+        dct = cache_dict.setdefault(method, {})
+        key = (args, frozenset(kwargs.items()))
+        try:
+            return dct[key]
+        except KeyError:
+            result = method(self, *args, **kwargs)
+            dct[key] = result
+            return result
+    return wrapper
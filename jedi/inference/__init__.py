@@ -62,22 +62,29 @@ I need to mention now that lazy type inference is really good because it
 only *inferes* what needs to be *inferred*. All the statements and modules
 that are not used are just being ignored.
 """
+from contextlib import contextmanager
+from itertools import islice
+from threading import RLock
+
 import parso
 from jedi.file_io import FileIO
 
 from jedi import debug
 from jedi import settings
+from jedi.cache import get_parser_lock, LRUCache
 from jedi.inference import imports
 from jedi.inference import recursion
-from jedi.inference.cache import inference_state_function_cache
+from jedi.inference.cache import inference_state_function_cache, \
+    invalidate_memoize_cache, evict_memoize_cache, discard_memoize_generations
 from jedi.inference import helpers
 from jedi.inference.names import TreeNameDefinition
 from jedi.inference.base_value import ContextualizedNode, \
-    ValueSet, iterate_values
+    ValueSet, iterate_values, NO_VALUES
 from jedi.inference.value import ClassValue, FunctionValue
 from jedi.inference.syntax_tree import infer_expr_stmt, \
     check_tuple_assignments, tree_name_to_values
 from jedi.inference.imports import follow_error_node_imports_if_possible
+from jedi.inference.gradual.typeshed_index import STUB_GRAMMAR_VERSION
 from jedi.plugins import plugin_manager
 
 
@@ -90,8 +97,10 @@ class InferenceState:
         self.compiled_subprocess = environment.get_inference_state_subprocess(self)
         self.grammar = environment.get_grammar()
 
-        self.latest_grammar = parso.load_grammar(version='3.12')
+        self.latest_grammar = parso.load_grammar(version=STUB_GRAMMAR_VERSION)
         self.memoize_cache = {}  # for memoize decorators
+        self.memoize_dependencies = {}  # Dict[Path, Set[Tuple[function, key]]]
+        self.memoize_dependency_stack = []  # see `inference.cache`
         self.module_cache = imports.ModuleCache()  # does the job of `sys.modules`.
         self.stub_module_cache = {}  # Dict[Tuple[str, ...], Optional[ModuleValue]]
         self.compiled_cache = {}  # see `inference.compiled.create()`
@@ -103,8 +112,18 @@ class InferenceState:
         self.is_analysis = False
         self.project = project
         self.access_cache = {}
+        # The cached values keep many others alive, therefore only a few
+        # callees are cached, see `api.helpers.cache_signatures`.
+        self.signature_cache = LRUCache(10)
         self.allow_unsafe_executions = False
         self.flow_analysis_enabled = True
+        self.cache_generation = 0
+        self._api_call_depth = 0  # see `api_call`
+        self.should_stop = None  # see `stop_when`
+        self.was_stopped = False
+        # An inference state can only be used by one thread at a time. The API
+        # acquires this for its calls.
+        self.lock = RLock()
 
         self.reset_recursion_limitations()
 
@@ -115,6 +134,8 @@ class InferenceState:
     @staticmethod
     @plugin_manager.decorate()
     def execute(value, arguments):
+        if value.inference_state.is_stopped():
+            return NO_VALUES
         debug.dbg('execute: %s %s', value, arguments)
         with debug.increase_indent_cm():
             value_set = value.py__call__(arguments=arguments)
@@ -135,10 +156,139 @@ class InferenceState:
         typing_module, = self.import_module(('typing',))
         return typing_module
 
+    @contextmanager
+    def stop_when(self, should_stop):
+        """
+        Makes the inference give up once ``should_stop()`` returns True. All
+        inference then returns nothing, which leads to partial results.
+        Memoized results of a stopped call may therefore be incomplete and
+        are discarded at the end.
+
+        Nested calls keep the callback of the outermost call.
+        """
+        if should_stop is None or self.should_stop is not None:
+            yield
+            return
+
+        self.should_stop = should_stop
+        generation = self.cache_generation
+        try:
+            yield
+        finally:
+            self.should_stop = None
+            if self.was_stopped:
+                self.was_stopped = False
+                discard_memoize_generations(self, generation)
+
+    def is_stopped(self):
+        if self.should_stop is not None and self.should_stop():
+            if not self.was_stopped:
+                debug.warning('Inference was stopped, results are partial')
+            self.was_stopped = True
+            return True
+        return False
+
     def reset_recursion_limitations(self):
         self.recursion_detector = recursion.RecursionDetector()
         self.execution_recursion_detector = recursion.ExecutionRecursionDetector(self)
 
+    @contextmanager
+    def api_call(self):
+        """
+        Wraps the calls of the API. The start of the outermost call is the
+        right time to account for cache usage, because nothing is being
+        inferred and no value of the caches is in use.
+        """
+        if not self._api_call_depth:
+            self.cache_generation += 1
+            self.limit_caches(settings.inference_cache_limit)
+        self._api_call_depth += 1
+        try:
+            yield
+        finally:
+            self._api_call_depth -= 1
+
+    def get_cache_sizes(self):
+        """
+        Returns the amount of entries in the different caches.
+
+        :rtype: Dict[str, int]
+        """
+        return {
+            'memoize': sum(len(memo) for memo in self.memoize_cache.values()),
+            'module': len(self.module_cache),
+            'stub_module': len(self.stub_module_cache),
+            'compiled': len(self.compiled_cache),
+            'mixed': len(self.mixed_cache),
+            'access': len(self.access_cache),
+        }
+
+    def limit_caches(self, limit):
+        """
+        Evicts cache entries until there are at most ``limit`` entries left.
+        Memoized results (including compiled values) are evicted first, then
+        the entries of the other compiled caches and at last whole modules.
+        Memoized results and modules are evicted least recently used first.
+        """
+        if limit is None:
+            return
+        total = sum(self.get_cache_sizes().values())
+        if total <= limit:
+            return
+
+        # Remove a bit more than necessary, so this doesn't happen all the time.
+        to_remove = total - limit * 3 // 4
+        debug.dbg('Cache limit %s reached, removing %s entries', limit, to_remove)
+        to_remove -= evict_memoize_cache(self, to_remove)
+        # Compiled and mixed values are memoized like everything else, so their
+        # use is tracked by the memoize cache. Jedi itself doesn't use these
+        # older dicts, whatever is in there is removed in insertion order.
+        for cache in (self.access_cache, self.mixed_cache, self.compiled_cache):
+            if to_remove <= 0:
+                return
+            keys = list(islice(cache, to_remove))
+            for key in keys:
+                del cache[key]
+            to_remove -= len(keys)
+        if to_remove > 0:
+            for path in self.module_cache.evict(to_remove):
+                invalidate_memoize_cache(self, path)
+
+    def set_script_path(self, script_path):
+        """
+        An inference state can be reused for different scripts (see
+        :class:`jedi.api.session.Session`). The sys path depends on the script
+        path, so cached results cannot be trusted anymore if the sys path
+        changes. Scripts in the same folder usually share their sys path.
+        """
+        if script_path == self.script_path:
+            return
+        old_sys_paths = self._get_script_sys_paths()
+        self.script_path = script_path
+        if self._get_script_sys_paths() != old_sys_paths:
+            debug.dbg('The sys path changed, clearing the memoize cache')
+            self.memoize_cache.clear()
+            self.memoize_dependencies.clear()
+
+    def _get_script_sys_paths(self):
+        # All the variants of the sys path that depend on the script path.
+        return [
+            self.get_sys_path(add_init_paths=add_init_paths)
+            for add_init_paths in (False, True)
+        ]
+
+    def invalidate_path(self, path):
+        """
+        Removes all modules that were loaded from ``path`` and all memoized
+        results that depend on these modules.
+        """
+        self.module_cache.invalidate_path(path)
+        for import_names, module in list(self.stub_module_cache.items()):
+            if module is not None and module.py__file__() == path:
+                del self.stub_module_cache[import_names]
+        invalidate_memoize_cache(self, path)
+        self.signature_cache.clear()
+
     def get_sys_path(self, **kwargs):
         """Convenience function"""
         return self.project._get_sys_path(self, **kwargs)
@@ -193,7 +343,11 @@ class InferenceState:
             code = code[:settings._cropped_file_size]
 
         grammar = self.latest_grammar if use_latest_grammar else self.grammar
-        return grammar.parse(code=code, path=path, file_io=file_io, **kwargs), code
+        if path is None and file_io is None:
+            # Nothing is cached.
+            return grammar.parse(code=code, **kwargs), code
+        with get_parser_lock(path if file_io is None else file_io.path):
+            return grammar.parse(code=code, path=path, file_io=file_io, **kwargs), code
 
     def parse(self, *args, **kwargs):
         return self.parse_and_get_code(*args, **kwargs)[0]
@@ -2,13 +2,146 @@
 - the popular ``_memoize_default`` works like a typical memoize and returns the
   default otherwise.
 - ``CachedMetaClass`` uses ``_memoize_default`` to do the same with classes.
+
+All memoized results also remember the paths of the modules they depend on.
+This is done by looking at the modules of the arguments and of the result and
+by passing the dependencies of nested memoized calls to their callers. With
+this information ``invalidate_memoize_cache`` can remove only the results
+that are affected by a changed file.
+
+Results are also stamped with the ``cache_generation`` of the inference state
+in which they were created and in which they were used last. The first one is
+needed by ``discard_memoize_generations`` to remove the results of a stopped
+call, the second one by ``evict_memoize_cache`` to remove the least recently
+used results once the caches grow too big.
 """
+import heapq
+from contextlib import contextmanager
 from functools import wraps
+
 from jedi import debug
+
 _NO_DEFAULT = object()
 _RECURSION_SENTINEL = object()
 
-def _memoize_default(default=_NO_DEFAULT, inference_state_is_first_arg=False, second_arg_is_inference_state=False):
+
+def _add_module_paths(paths, obj):
+    from jedi.inference.base_value import ValueSet
+
+    if isinstance(obj, (ValueSet, list, tuple, set, frozenset)):
+        for o in obj:
+            _add_module_paths(paths, o)
+        return
+
+    # Only look at the class, objects like access handles respond to any
+    # attribute.
+    if getattr(type(obj), 'get_root_context', None) is None:
+        return
+    path = obj.get_root_context().py__file__()
+    if path is not None:
+        paths.add(path)
+
+
+def _push_dependencies(inference_state):
+    paths = set()
+    inference_state.memoize_dependency_stack.append(paths)
+    return paths
+
+
+def _pop_dependencies(inference_state, paths):
+    stack = inference_state.memoize_dependency_stack
+    stack.pop()
+    if stack:
+        # Whoever called us depends on the same modules.
+        stack[-1].update(paths)
+
+
+def _register_dependencies(inference_state, function, key, paths):
+    for path in paths:
+        inference_state.memoize_dependencies.setdefault(path, set()).add((function, key))
+
+
+def _use_cached_dependencies(inference_state, paths):
+    stack = inference_state.memoize_dependency_stack
+    if stack:
+        stack[-1].update(paths)
+
+
+@contextmanager
+def record_dependencies(inference_state):
+    """
+    Yields a set that collects the paths of the modules that everything
+    inferred within this context depends on.
+    """
+    paths = _push_dependencies(inference_state)
+    try:
+        yield paths
+    finally:
+        _pop_dependencies(inference_state, paths)
+
+
+def _remove_entry(inference_state, function, key):
+    try:
+        _, paths, _, _ = inference_state.memoize_cache[function].pop(key)
+    except KeyError:
+        return
+    for path in paths:
+        entries = inference_state.memoize_dependencies.get(path)
+        if entries is not None:
+            entries.discard((function, key))
+
+
+def invalidate_memoize_cache(inference_state, path):
+    """
+    Removes all memoized results that depend on the module at ``path``.
+    """
+    entries = inference_state.memoize_dependencies.pop(path, ())
+    for function, key in entries:
+        _remove_entry(inference_state, function, key)
+    debug.dbg('Removed %s memoized results of %s', len(entries), path)
+
+
+def discard_memoize_generations(inference_state, generation):
+    """
+    Removes all memoized results that were created since ``generation``.
+    Results that were only used since then are complete and are kept.
+    """
+    entries = [
+        (function, key)
+        for function, memo in inference_state.memoize_cache.items()
+        for key, entry in memo.items()
+        if entry[2] >= generation
+    ]
+    for function, key in entries:
+        _remove_entry(inference_state, function, key)
+    debug.dbg('Removed %s memoized results since generation %s', len(entries), generation)
+
+
+def evict_memoize_cache(inference_state, count):
+    """
+    Removes up to ``count`` memoized results that have not been used for the
+    longest time. Results of the current generation are never removed.
+
+    :returns: The amount of removed results.
+    """
+    current = inference_state.cache_generation
+    candidates = heapq.nsmallest(
+        count,
+        (
+            (entry[3], function, key)
+            for function, memo in inference_state.memoize_cache.items()
+            for key, entry in memo.items()
+            if entry[3] != current
+        ),
+        key=lambda candidate: candidate[0],
+    )
+    for _, function, key in candidates:
+        _remove_entry(inference_state, function, key)
+    return len(candidates)
+
+
+def _memoize_default(default=_NO_DEFAULT, inference_state_is_first_arg=False,
+                     second_arg_is_inference_state=False):
     """ This is a typical memoization decorator, BUT there is one difference:
     To prevent recursion it sets defaults.
 
@@ -16,7 +149,79 @@ def _memoize_default(default=_NO_DEFAULT, inference_state_is_first_arg=False, se
     don't think, that there is a big speed difference, but there are many cases
     where recursion could happen (think about a = b; b = a).
     """
-    pass
+    if inference_state_is_first_arg:
+        def get_inference_state(obj, args):
+            return obj
+    elif second_arg_is_inference_state:
+        def get_inference_state(obj, args):
+            return args[0]  # needed for meta classes
+    else:
+        def get_inference_state(obj, args):
+            return obj.inference_state
+
+    def func(function):
+        @wraps(function)
+        def wrapper(obj, *args, **kwargs):
+            inference_state = get_inference_state(obj, args)
+            cache = inference_state.memoize_cache
+
+            try:
+                memo = cache[function]
+            except KeyError:
+                cache[function] = memo = {}
+
+            key = (obj, args, frozenset(kwargs.items()))
+            generation = inference_state.cache_generation
+            try:
+                result, paths, created, used = memo[key]
+            except KeyError:
+                pass
+            else:
+                if used != generation:
+                    memo[key] = result, paths, created, generation
+                _use_cached_dependencies(inference_state, paths)
+                return result
+
+            if default is not _NO_DEFAULT:
+                memo[key] = default, frozenset(), generation, generation
+            paths = _push_dependencies(inference_state)
+            try:
+                rv = function(obj, *args, **kwargs)
+                if not inference_state_is_first_arg:
+                    _add_module_paths(paths, obj)
+                _add_module_paths(paths, args)
+                _add_module_paths(paths, rv)
+            finally:
+                _pop_dependencies(inference_state, paths)
+            paths = frozenset(paths)
+            memo[key] = rv, paths, generation, generation
+            _register_dependencies(inference_state, function, key, paths)
+            return rv
+        return wrapper
+
+    return func
+
+
+def inference_state_function_cache(default=_NO_DEFAULT):
+    def decorator(func):
+        return _memoize_default(default=default, inference_state_is_first_arg=True)(func)
+
+    return decorator
+
+
+def inference_state_method_cache(default=_NO_DEFAULT):
+    def decorator(func):
+        return _memoize_default(default=default)(func)
+
+    return decorator
+
+
+def inference_state_as_method_param_cache():
+    def decorator(call):
+        return _memoize_default(second_arg_is_inference_state=True)(call)
+
+    return decorator
+
 
 class CachedMetaClass(type):
     """
@@ -29,9 +234,70 @@ class CachedMetaClass(type):
     def __call__(self, *args, **kwargs):
         return super().__call__(*args, **kwargs)
 
+
 def inference_state_method_generator_cache():
     """
     This is a special memoizer. It memoizes generators and also checks for
     recursion errors and returns no further iterator elemends in that case.
     """
-    pass
\ No newline at end of file
+    def func(function):
+        @wraps(function)
+        def wrapper(obj, *args, **kwargs):
+            inference_state = obj.inference_state
+            cache = inference_state.memoize_cache
+            try:
+                memo = cache[function]
+            except KeyError:
+                cache[function] = memo = {}
+
+            key = (obj, args, frozenset(kwargs.items()))
+            generation = inference_state.cache_generation
+
+            if key in memo:
+                (actual_generator, cached_lst), paths, created, used = memo[key]
+                if used != generation:
+                    memo[key] = (actual_generator, cached_lst), paths, created, generation
+            else:
+                actual_generator = function(obj, *args, **kwargs)
+                cached_lst = []
+                # The dependencies grow while the generator is consumed.
+                paths = set()
+                _add_module_paths(paths, obj)
+                _add_module_paths(paths, args)
+                memo[key] = (actual_generator, cached_lst), paths, generation, generation
+                _register_dependencies(inference_state, function, key, paths)
+
+            # The paths are only passed on when they grew, otherwise every
+            # element would copy all of them again.
+            used_paths = len(paths)
+            _use_cached_dependencies(inference_state, paths)
+            i = 0
+            while True:
+                try:
+                    next_element = cached_lst[i]
+                    if next_element is _RECURSION_SENTINEL:
+                        debug.warning('Found a generator recursion for %s' % obj)
+                        # This means we have hit a recursion.
+                        return
+                except IndexError:
+                    new_paths = _push_dependencies(inference_state)
+                    try:
+                        next_element = next(actual_generator, None)
+                        _add_module_paths(new_paths, next_element)
+                    finally:
+                        _pop_dependencies(inference_state, new_paths)
+                    new_paths -= paths
+                    paths |= new_paths
+                    _register_dependencies(inference_state, function, key, new_paths)
+                    if next_element is None:
+                        cached_lst.append(_RECURSION_SENTINEL)
+                        return
+                    cached_lst.append(next_element)
+                if len(paths) != used_paths:
+                    used_paths = len(paths)
+                    _use_cached_dependencies(inference_state, paths)
+                yield next_element
+                i += 1
+        return wrapper
+
+    return func
@@ -24,6 +24,10 @@ _OPERATORS = {'+': op.add, '-': op.sub}
 _OPERATORS.update(COMPARISON_OPERATORS)
 ALLOWED_DESCRIPTOR_ACCESS = (types.FunctionType, types.GetSetDescriptorType, types.MemberDescriptorType, MethodDescriptorType, WrapperDescriptorType, ClassMethodDescriptorType, staticmethod, classmethod)
 SignatureParam = namedtuple('SignatureParam', 'name has_default default default_string has_annotation annotation annotation_string kind_name')
+MemberInfo = namedtuple(
+    'MemberInfo',
+    'name api_type has_attribute is_descriptor has_property_annotation',
+)
 
 class AccessPath:
 
@@ -52,6 +56,52 @@ class DirectObjectAccess:
         """
         pass
 
+    def get_member_snapshot(self):
+        """
+        Returns everything that is needed to list the members of an object
+        with a single call, as ``Tuple[bool, Tuple[MemberInfo, ...]]``. The
+        bool is the same as ``needs_type_completions``.
+
+        Descriptors are never executed.
+        """
+        members = []
+        for name in self.dir():
+            has_attribute, is_descriptor, property_annotation = self.is_allowed_getattr(name)
+            api_type = 'instance'
+            if has_attribute and not is_descriptor:
+                try:
+                    with warnings.catch_warnings(record=True):
+                        warnings.simplefilter('always')
+                        api_type = get_api_type(getattr(self._obj, name))
+                except Exception:
+                    pass
+            members.append(MemberInfo(
+                name,
+                api_type,
+                has_attribute,
+                is_descriptor,
+                property_annotation is not None,
+            ))
+        return self.needs_type_completions(), tuple(members)
+
+    def get_member_docstrings(self, names):
+        """
+        Returns the docstrings of many members with a single call, as
+        ``Dict[str, str]``. Descriptors are never executed and therefore
+        missing.
+        """
+        docstrings = {}
+        for name in names:
+            has_attribute, is_descriptor, _ = self.is_allowed_getattr(name)
+            if has_attribute and not is_descriptor:
+                try:
+                    with warnings.catch_warnings(record=True):
+                        warnings.simplefilter('always')
+                        docstrings[name] = inspect.getdoc(getattr(self._obj, name)) or ''
+                except Exception:
+                    pass
+        return docstrings
+
 def _is_class_instance(obj):
     """Like inspect.* methods."""
     pass
\ No newline at end of file
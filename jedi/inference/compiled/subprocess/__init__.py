@@ -8,26 +8,37 @@ goals:
 """
 
 import collections
+import itertools
+import marshal
 import os
+import pickle
 import sys
 import queue
+import socket
+import struct
 import subprocess
 import traceback
 import weakref
 from functools import partial
-from threading import Thread
+from threading import Thread, Lock
 
 from jedi._compatibility import pickle_dump, pickle_load
 from jedi import debug
+from jedi import settings
 from jedi.cache import memoize_method
 from jedi.inference.compiled.subprocess import functions
 from jedi.inference.compiled.access import DirectObjectAccess, AccessPath, \
-    SignatureParam
+    SignatureParam, MemberInfo
 from jedi.api.exceptions import InternalError
 
 
 _MAIN_PATH = os.path.join(os.path.dirname(__file__), '__main__.py')
 PICKLE_PROTOCOL = 4
+# Framed messages start with the length of the payload and its encoding.
+_FRAME_HEADER = struct.Struct('>IB')
+_MARSHAL = 0
+_PICKLE = 1
+_MARSHAL_VERSION = 4
 
 
 def _GeneralizedPopen(*args, **kwargs):
@@ -62,11 +73,56 @@ def _add_stderr_to_debug(stderr_queue):
             break
 
 
+def _write_message(file, obj, framed, use_marshal=False):
+    if not framed:
+        pickle_dump(obj, file, PICKLE_PROTOCOL)
+        return
+
+    # Most responses are just tuples of strings, numbers and bools. marshal
+    # is a lot cheaper for those. Everything else (e.g. access handles,
+    # functions, exceptions and namedtuples) is pickled. The format of
+    # marshal may change between Python versions, so it's only used if both
+    # sides run the same version.
+    encoding = _PICKLE
+    if use_marshal:
+        try:
+            encoding, data = _MARSHAL, marshal.dumps(obj, _MARSHAL_VERSION)
+        except ValueError:
+            pass
+    if encoding == _PICKLE:
+        data = pickle.dumps(obj, PICKLE_PROTOCOL)
+    try:
+        file.write(_FRAME_HEADER.pack(len(data), encoding) + data)
+        file.flush()
+    except OSError:
+        if sys.platform == 'win32':
+            raise BrokenPipeError
+        raise
+
+
+def _read_exactly(file, size):
+    data = file.read(size)
+    if len(data) < size:
+        raise EOFError("Expected %s bytes, got %s" % (size, len(data)))
+    return data
+
+
+def _read_message(file, framed):
+    if not framed:
+        return pickle_load(file)
+
+    size, encoding = _FRAME_HEADER.unpack(_read_exactly(file, _FRAME_HEADER.size))
+    data = _read_exactly(file, size)
+    if encoding == _MARSHAL:
+        return marshal.loads(data)
+    return pickle.loads(data)
+
+
 def _get_function(name):
     return getattr(functions, name)
 
 
-def _cleanup_process(process, thread):
+def _cleanup_process(process, thread, files=()):
     try:
         process.kill()
         process.wait()
@@ -74,7 +130,7 @@ def _cleanup_process(process, thread):
         # Raised if the process is already killed.
         pass
     thread.join()
-    for stream in [process.stdin, process.stdout, process.stderr]:
+    for stream in [process.stdin, process.stdout, process.stderr, *files]:
         try:
             stream.close()
         except OSError:
@@ -83,6 +139,8 @@ def _cleanup_process(process, thread):
 
 
 class _InferenceStateProcess:
+    is_crashed = False
+
     def __init__(self, inference_state):
         self._inference_state_weakref = weakref.ref(inference_state)
         self._inference_state_id = id(inference_state)
@@ -104,6 +162,20 @@ class _InferenceStateProcess:
     def set_access_handle(self, handle):
         self._handles[handle.id] = handle
 
+    def run_many(self, calls):
+        """
+        Runs a list of ``(function_name, args, kwargs)`` calls of
+        ``functions.py``. Returns a list of ``(is_exception, result)``, where
+        the result is the raised exception if ``is_exception`` is true.
+        """
+        results = []
+        for name, args, kwargs in calls:
+            try:
+                results.append((False, getattr(self, name)(*args, **kwargs)))
+            except Exception as e:
+                results.append((True, e))
+        return results
+
 
 class InferenceStateSameProcess(_InferenceStateProcess):
     """
@@ -140,9 +212,29 @@ class InferenceStateSubprocess(_InferenceStateProcess):
 
         return wrapper
 
+    @property
+    def is_crashed(self):
+        return self._compiled_subprocess.is_crashed
+
+    def run_many(self, calls):
+        """
+        Like :meth:`_InferenceStateProcess.run_many`, but all calls are sent
+        to the subprocess in a single message.
+        """
+        self._used = True
+        results = self._compiled_subprocess.run_many(
+            self._inference_state_weakref(),
+            [(_get_function(name), args, kwargs) for name, args, kwargs in calls],
+        )
+        return [(is_exception, self._convert_access_handles(result))
+                for is_exception, result in results]
+
     def _convert_access_handles(self, obj):
         if isinstance(obj, SignatureParam):
             return SignatureParam(*self._convert_access_handles(tuple(obj)))
+        elif isinstance(obj, MemberInfo):
+            # Contains only strings and bools.
+            return obj
         elif isinstance(obj, tuple):
             return tuple(self._convert_access_handles(o) for o in obj)
         elif isinstance(obj, list):
@@ -165,12 +257,23 @@ class InferenceStateSubprocess(_InferenceStateProcess):
 
 class CompiledSubprocess:
     is_crashed = False
+    # The amount of access handles that deleted inference states freed in the
+    # subprocess.
+    freed_access_handles = 0
 
     def __init__(self, executable, env_vars=None):
         self._executable = executable
         self._env_vars = env_vars
         self._inference_state_deletion_queue = collections.deque()
         self._cleanup_callable = lambda: None
+        self._request_ids = itertools.count()
+        # Responses that were received while waiting for another request.
+        self._pending_responses = {}
+        # Nobody waits for the responses of these requests.
+        self._deletion_requests = set()
+        # Multiple threads may share a subprocess, a request and its response
+        # must not be interleaved with other requests.
+        self._lock = Lock()
 
     def __repr__(self):
         pid = os.getpid()
@@ -185,19 +288,43 @@ class CompiledSubprocess:
     def _get_process(self):
         debug.dbg('Start environment subprocess %s', self._executable)
         parso_path = sys.modules['parso'].__file__
+        transport = settings.compiled_subprocess_transport
+        kwargs = {}
+        if transport == 'socket':
+            if hasattr(socket, 'AF_UNIX'):
+                parent_socket, child_socket = socket.socketpair()
+                kwargs['pass_fds'] = (child_socket.fileno(),)
+                transport = 'socket:%s' % child_socket.fileno()
+            else:
+                debug.warning('Sockets are not available, using pipes')
+                transport = 'framed'
         args = (
             self._executable,
             _MAIN_PATH,
             os.path.dirname(os.path.dirname(parso_path)),
             '.'.join(str(x) for x in sys.version_info[:3]),
+            transport,
         )
         process = _GeneralizedPopen(
             args,
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            env=self._env_vars
+            env=self._env_vars,
+            **kwargs
         )
+        self._framed = transport != 'pipe'
+        if 'pass_fds' in kwargs:
+            child_socket.close()
+            self._writer = parent_socket.makefile('wb')
+            self._reader = parent_socket.makefile('rb')
+            # The files keep the socket alive.
+            parent_socket.close()
+            files = (self._writer, self._reader)
+        else:
+            self._writer = process.stdin
+            self._reader = process.stdout
+            files = ()
         self._stderr_queue = queue.Queue()
         self._stderr_thread = t = Thread(
             target=_enqueue_output,
@@ -210,22 +337,55 @@ class CompiledSubprocess:
         self._cleanup_callable = weakref.finalize(self,
                                                   _cleanup_process,
                                                   process,
-                                                  t)
+                                                  t,
+                                                  files)
         return process
 
-    def run(self, inference_state, function, args=(), kwargs={}):
-        # Delete old inference_states.
+    def _delete_old_inference_states(self):
+        """
+        Sends all queued deletions in one message. The response is not waited
+        for, it is read together with the response of the next request.
+        """
+        calls = []
         while True:
             try:
                 inference_state_id = self._inference_state_deletion_queue.pop()
             except IndexError:
                 break
             else:
-                self._send(inference_state_id, None)
+                calls.append((inference_state_id, None, (), {}))
+
+        if calls:
+            with self._lock:
+                self._deletion_requests.add(self._write_request(calls))
+
+    def run(self, inference_state, function, args=(), kwargs={}):
+        self._delete_old_inference_states()
 
         assert callable(function)
         return self._send(id(inference_state), function, args, kwargs)
 
+    def run_many(self, inference_state, calls):
+        """
+        Sends a list of ``(function, args, kwargs)`` in one message. Returns a
+        list of ``(is_exception, result)``, exceptions are not raised.
+        """
+        self._delete_old_inference_states()
+
+        inference_state_id = id(inference_state)
+        with self._lock:
+            request_id = self._write_request([
+                (inference_state_id, function, args, kwargs)
+                for function, args, kwargs in calls
+            ])
+            responses = self._read_response(request_id)
+        results = []
+        for is_exception, formatted_traceback, result in responses:
+            if is_exception:
+                result.args = (formatted_traceback,)
+            results.append((is_exception, result))
+        return results
+
     def get_sys_path(self):
         return self._send(None, functions.get_sys_path, (), {})
 
@@ -233,35 +393,58 @@ class CompiledSubprocess:
         self.is_crashed = True
         self._cleanup_callable()
 
-    def _send(self, inference_state_id, function, args=(), kwargs={}):
+    def _write_request(self, calls):
+        """
+        Writes a request without waiting for the response. Multiple requests
+        can be in flight, the subprocess answers them in order.
+        """
         if self.is_crashed:
             raise InternalError("The subprocess %s has crashed." % self._executable)
 
-        data = inference_state_id, function, args, kwargs
+        request_id = next(self._request_ids)
         try:
-            pickle_dump(data, self._get_process().stdin, PICKLE_PROTOCOL)
+            self._get_process()
+            _write_message(self._writer, (request_id, calls), self._framed)
         except BrokenPipeError:
             self._kill()
             raise InternalError("The subprocess %s was killed. Maybe out of memory?"
                                 % self._executable)
+        return request_id
 
-        try:
-            is_exception, traceback, result = pickle_load(self._get_process().stdout)
-        except EOFError as eof_error:
+    def _read_response(self, request_id):
+        while request_id not in self._pending_responses:
             try:
-                stderr = self._get_process().stderr.read().decode('utf-8', 'replace')
-            except Exception as exc:
-                stderr = '<empty/not available (%r)>' % exc
-            self._kill()
-            _add_stderr_to_debug(self._stderr_queue)
-            raise InternalError(
-                "The subprocess %s has crashed (%r, stderr=%s)." % (
-                    self._executable,
-                    eof_error,
-                    stderr,
-                ))
+                self._get_process()
+                response_id, results = _read_message(self._reader, self._framed)
+            except EOFError as eof_error:
+                try:
+                    stderr = self._get_process().stderr.read().decode('utf-8', 'replace')
+                except Exception as exc:
+                    stderr = '<empty/not available (%r)>' % exc
+                self._kill()
+                _add_stderr_to_debug(self._stderr_queue)
+                raise InternalError(
+                    "The subprocess %s has crashed (%r, stderr=%s)." % (
+                        self._executable,
+                        eof_error,
+                        stderr,
+                    ))
+            if response_id in self._deletion_requests:
+                self._deletion_requests.remove(response_id)
+                freed = sum(r for is_exception, _, r in results if not is_exception)
+                self.freed_access_handles += freed
+                debug.dbg('Deleted %s inference states in the subprocess, '
+                          'freed %s access handles', len(results), freed)
+                continue
+            self._pending_responses[response_id] = results
 
         _add_stderr_to_debug(self._stderr_queue)
+        return self._pending_responses.pop(request_id)
+
+    def _send(self, inference_state_id, function, args=(), kwargs={}):
+        with self._lock:
+            request_id = self._write_request([(inference_state_id, function, args, kwargs)])
+            (is_exception, traceback, result), = self._read_response(request_id)
 
         if is_exception:
             # Replace the attribute error message with a the traceback. It's
@@ -273,9 +456,9 @@ class CompiledSubprocess:
     def delete_inference_state(self, inference_state_id):
         """
         Currently we are not deleting inference_state instantly. They only get
-        deleted once the subprocess is used again. It would probably a better
-        solution to move all of this into a thread. However, the memory usage
-        of a single inference_state shouldn't be that high.
+        deleted once the subprocess is used again. All deletions are then sent
+        in a single message that is not waited for, so they don't delay the
+        actual request.
         """
         # With an argument - the inference_state gets deleted.
         self._inference_state_deletion_queue.append(inference_state_id)
@@ -308,7 +491,11 @@ class Listener:
         if inference_state_id is None:
             return function(*args, **kwargs)
         elif function is None:
-            del self._inference_states[inference_state_id]
+            # Report the amount of access handles that are freed. The objects
+            # they refer to are what uses memory, but their size cannot be
+            # measured reliably.
+            inference_state = self._inference_states.pop(inference_state_id)
+            return len(inference_state.compiled_subprocess._handles)
         else:
             inference_state = self._get_inference_state(function, inference_state_id)
 
@@ -323,7 +510,7 @@ class Listener:
 
             return function(inference_state, *args, **kwargs)
 
-    def listen(self):
+    def listen(self, transport='pipe', use_marshal=False):
         stdout = sys.stdout
         # Mute stdout. Nobody should actually be able to write to it,
         # because stdout is used for IPC.
@@ -331,20 +518,30 @@ class Listener:
         stdin = sys.stdin
         stdout = stdout.buffer
         stdin = stdin.buffer
+        if transport.startswith('socket:'):
+            fileno = int(transport[len('socket:'):])
+            connection = socket.fromfd(fileno, socket.AF_UNIX, socket.SOCK_STREAM)
+            os.close(fileno)
+            stdin = connection.makefile('rb')
+            stdout = connection.makefile('wb')
+        framed = transport != 'pipe'
 
         while True:
             try:
-                payload = pickle_load(stdin)
+                request_id, calls = _read_message(stdin, framed)
             except EOFError:
                 # It looks like the parent process closed.
                 # Don't make a big fuss here and just exit.
                 exit(0)
-            try:
-                result = False, None, self._run(*payload)
-            except Exception as e:
-                result = True, traceback.format_exc(), e
+            results = []
+            for call in calls:
+                try:
+                    result = False, None, self._run(*call)
+                except Exception as e:
+                    result = True, traceback.format_exc(), e
+                results.append(result)
 
-            pickle_dump(result, stdout, PICKLE_PROTOCOL)
+            _write_message(stdout, (request_id, results), framed, use_marshal)
 
 
 class AccessHandle:
@@ -386,6 +583,40 @@ class AccessHandle:
             return self._subprocess.get_compiled_method_return(self.id, name, *args, **kwargs)
         return self._cached_results(name, *args, **kwargs)
 
-    @memoize_method
+    def _get_results_cache(self):
+        # Not set in __init__, because unpickled handles don't call it.
+        return self.__dict__.setdefault('_results_cache', {})
+
     def _cached_results(self, name, *args, **kwargs):
-        return self._subprocess.get_compiled_method_return(self.id, name, *args, **kwargs)
+        cache = self._get_results_cache()
+        key = name, args, frozenset(kwargs.items())
+        try:
+            return cache[key]
+        except KeyError:
+            result = self._subprocess.get_compiled_method_return(self.id, name, *args, **kwargs)
+            cache[key] = result
+            return result
+
+    def prefetch(self, calls):
+        """
+        Fetches the results of many method calls on the accessed object in a
+        single round trip, e.g. ``[('dir', (), {}), ('get_repr', (), {})]``.
+        Later calls of these methods with the same arguments use the fetched
+        results. Calls that raise an exception are not cached and raise once
+        they are called normally.
+        """
+        cache = self._get_results_cache()
+        missing = []
+        for name, args, kwargs in calls:
+            key = name, tuple(args), frozenset(kwargs.items())
+            if key not in cache:
+                missing.append((key, kwargs))
+        if not missing:
+            return
+        results = self._subprocess.run_many([
+            ('get_compiled_method_return', (self.id, name) + args, kwargs)
+            for (name, args, _), kwargs in missing
+        ])
+        for (key, _), (is_exception, result) in zip(missing, results):
+            if not is_exception:
+                cache[key] = result
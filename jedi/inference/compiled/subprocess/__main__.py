@@ -36,5 +36,7 @@ sys.meta_path.pop(0)
 
 # Retrieve the pickle protocol.
 host_sys_version = [int(x) for x in sys.argv[2].split('.')]
+# The format of marshal is only known to match for the same Python version.
+use_marshal = host_sys_version[:2] == list(sys.version_info[:2])
 # And finally start the client.
-subprocess.Listener().listen()
+subprocess.Listener().listen(sys.argv[3] if len(sys.argv) > 3 else 'pipe', use_marshal)
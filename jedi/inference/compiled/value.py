@@ -38,11 +38,41 @@ class CheckAttribute:
         return partial(self.func, instance)
 
 class CompiledValue(Value):
+    _member_snapshot = None
+    _member_docstrings = None
 
     def __init__(self, inference_state, access_handle, parent_context=None):
         super().__init__(inference_state, parent_context)
         self.access_handle = access_handle
 
+    def get_member_snapshot(self):
+        """
+        Returns ``(needs_type_completions, {name: MemberInfo})``. All members
+        are described with a single call to the subprocess, instead of a few
+        calls per member.
+        """
+        if self._member_snapshot is None:
+            needs_type_completions, members = self.access_handle.get_member_snapshot()
+            self._member_snapshot = (
+                needs_type_completions,
+                {member.name: member for member in members},
+            )
+        return self._member_snapshot
+
+    def prefetch_member_docstrings(self, names):
+        """
+        Fetches the docstrings of many members with a single call to the
+        subprocess. They are used by :meth:`CompiledName.py__doc__`.
+        """
+        if self._member_docstrings is None:
+            self._member_docstrings = {}
+        missing = [name for name in names if name not in self._member_docstrings]
+        if missing:
+            docstrings = self.access_handle.get_member_docstrings(missing)
+            for name in missing:
+                # None means that the docstring needs to be inferred.
+                self._member_docstrings[name] = docstrings.get(name)
+
     def __repr__(self):
         return '<%s: %s>' % (self.__class__.__name__, self.access_handle.get_repr())
 
@@ -51,12 +81,32 @@ class CompiledModule(CompiledValue):
 
 class CompiledName(AbstractNameDefinition):
 
-    def __init__(self, inference_state, parent_value, name, is_descriptor):
+    def __init__(self, inference_state, parent_value, name, is_descriptor, member_info=None):
         self._inference_state = inference_state
         self.parent_context = parent_value.as_context()
         self._parent_value = parent_value
         self.string_name = name
         self.is_descriptor = is_descriptor
+        self._member_info = member_info
+
+    def py__doc__(self):
+        docstrings = self._parent_value._member_docstrings
+        if docstrings is not None:
+            docstring = docstrings.get(self.string_name)
+            if docstring is not None:
+                return docstring
+        return self.infer_compiled_value().py__doc__()
+
+    @property
+    def api_type(self):
+        if self.is_descriptor:
+            # In case of properties we want to avoid executions as much as
+            # possible. Since the api_type can be wrong for other reasons
+            # anyway, we just return instance here.
+            return 'instance'
+        if self._member_info is not None:
+            return self._member_info.api_type
+        return self.infer_compiled_value().api_type
 
     def __repr__(self):
         try:
@@ -103,11 +153,109 @@ class CompiledValueFilter(AbstractFilter):
         self.compiled_value = compiled_value
         self.is_instance = is_instance
 
-    def _get(self, name, allowed_getattr_callback, in_dir_callback, check_has_attribute=False):
+    def get(self, name):
+        access_handle = self.compiled_value.access_handle
+        safe = not self._inference_state.allow_unsafe_executions
+        snapshot = self.compiled_value._member_snapshot
+        member = None if snapshot is None else snapshot[1].get(name)
+        if safe and member is not None and not member.has_property_annotation:
+            # Everything is already known from the snapshot of ``values``.
+            return self._get(
+                name,
+                lambda name: (member.has_attribute, member.is_descriptor, None),
+                lambda name: True,
+                check_has_attribute=True,
+                member_info=member,
+            )
+        if self.is_instance:
+            # Both are needed, fetch them in a single round trip.
+            access_handle.prefetch([
+                ('is_allowed_getattr', (name,), {'safe': safe}),
+                ('dir', (), {}),
+            ])
+        return self._get(
+            name,
+            lambda name: access_handle.is_allowed_getattr(name, safe=safe),
+            lambda name: name in access_handle.dir(),
+            check_has_attribute=True
+        )
+
+    def _get(self, name, allowed_getattr_callback, in_dir_callback,
+             check_has_attribute=False, member_info=None):
         """
         To remove quite a few access calls we introduced the callback here.
         """
-        pass
+        has_attribute, is_descriptor, property_return_annotation = allowed_getattr_callback(
+            name,
+        )
+        if property_return_annotation is not None:
+            values = create_from_access_path(
+                self._inference_state,
+                property_return_annotation
+            ).execute_annotation()
+            if values:
+                return [CompiledValueName(v, name) for v in values]
+
+        if check_has_attribute and not has_attribute:
+            return []
+
+        if (is_descriptor or not has_attribute) \
+                and not self._inference_state.allow_unsafe_executions:
+            return [self._get_cached_name(name, is_empty=True)]
+
+        if self.is_instance and not in_dir_callback(name):
+            return []
+        return [self._get_cached_name(
+            name,
+            is_descriptor=is_descriptor,
+            member_info=member_info,
+        )]
+
+    @memoize_method
+    def _get_cached_name(self, name, is_empty=False, *, is_descriptor=False, member_info=None):
+        if is_empty:
+            return EmptyCompiledName(self._inference_state, name)
+        else:
+            return self._create_name(name, is_descriptor=is_descriptor, member_info=member_info)
+
+    def values(self):
+        from jedi.inference.compiled import builtin_from_name
+        names = []
+        needs_type_completions, members = self.compiled_value.get_member_snapshot()
+        # The property annotations are not part of the snapshot. They are
+        # rare, but fetch them in a single round trip anyway.
+        safe = not self._inference_state.allow_unsafe_executions
+        self.compiled_value.access_handle.prefetch([
+            ('is_allowed_getattr', (member.name,), {'safe': safe})
+            for member in members.values() if member.has_property_annotation
+        ])
+        for member in members.values():
+            if member.has_property_annotation:
+                # The annotation is an access path, which is not part of the
+                # snapshot. Just ask again for these rare cases.
+                names += self.get(member.name)
+                continue
+            names += self._get(
+                member.name,
+                lambda name: (member.has_attribute, member.is_descriptor, None),
+                lambda name: True,
+                member_info=member,
+            )
+
+        # ``dir`` doesn't include the type names.
+        if not self.is_instance and needs_type_completions:
+            for filter in builtin_from_name(self._inference_state, 'type').get_filters():
+                names += filter.values()
+        return names
+
+    def _create_name(self, name, is_descriptor, member_info=None):
+        return CompiledName(
+            self._inference_state,
+            self.compiled_value,
+            name,
+            is_descriptor,
+            member_info,
+        )
 
     def __repr__(self):
         return '<%s: %s>' % (self.__class__.__name__, self.compiled_value)
@@ -125,4 +273,17 @@ def _parse_function_doc(doc):
 
 def _normalize_create_args(func):
     """The cache doesn't care about keyword vs. normal args."""
-    pass
\ No newline at end of file
+    pass
+
+def prefetch_docstrings(names):
+    """
+    Fetches the docstrings of the given names, with one call to the subprocess
+    per compiled object that contains some of them (e.g. all the completions
+    of ``os.``). Names that are not :class:`CompiledName` are ignored.
+    """
+    names_by_parent = {}
+    for name in names:
+        if isinstance(name, CompiledName) and not name.is_descriptor:
+            names_by_parent.setdefault(name._parent_value, []).append(name.string_name)
+    for parent_value, string_names in names_by_parent.items():
+        parent_value.prefetch_member_docstrings(string_names)
@@ -1,33 +1,89 @@
+import hashlib
 import os
+import pickle
 import re
 from functools import wraps
 from collections import namedtuple
 from typing import Dict, Mapping, Tuple
 from pathlib import Path
+from parso.cache import parser_cache, try_to_save_module
 from jedi import settings
+from jedi.cache import get_parser_lock
 from jedi.file_io import FileIO
 from jedi.parser_utils import get_cached_code_lines
 from jedi.inference.base_value import ValueSet, NO_VALUES
 from jedi.inference.gradual.stub_value import TypingModuleWrapper, StubModuleValue
 from jedi.inference.value import ModuleValue
+from jedi.inference.gradual import typeshed_index
 _jedi_path = Path(__file__).parent.parent.parent
 TYPESHED_PATH = _jedi_path.joinpath('third_party', 'typeshed')
 DJANGO_INIT_PATH = _jedi_path.joinpath('third_party', 'django-stubs', 'django-stubs', '__init__.pyi')
 _IMPORT_MAP = dict(_collections='collections', _socket='socket')
 PathInfo = namedtuple('PathInfo', 'path is_third_party')
+_INDEX_PATH = TYPESHED_PATH.parent.joinpath(typeshed_index.INDEX_NAME)
+_index = None
+_TREE_CACHE_PATH = TYPESHED_PATH.parent.joinpath(typeshed_index.TREE_CACHE_NAME)
+_tree_cache = None
+
+def _get_index():
+    """
+    The stub files of typeshed, listed when Jedi was installed. Returns an
+    empty dict if there's no index (e.g. in a git checkout).
+    """
+    global _index
+    if _index is None:
+        _index = typeshed_index.load_index(_INDEX_PATH) or {}
+    return _index
+
+def _merge_create_stub_map(path_infos):
+    map_ = {}
+    for directory_path_info in path_infos:
+        map_.update(_create_stub_map(directory_path_info))
+    return map_
 
 def _create_stub_map(directory_path_info):
     """
     Create a mapping of an importable name in Python to a stub file.
     """
-    pass
+    path = directory_path_info.path
+    relative_path = os.path.relpath(path, TYPESHED_PATH).replace(os.path.sep, '/')
+    stubs = _get_index().get(relative_path)
+    if stubs is None:
+        stubs = typeshed_index.list_stub_directory(path)
+    is_third_party = directory_path_info.is_third_party
+    return {name: PathInfo(os.path.join(path, stub), is_third_party) for name, stub in stubs.items()}
+
+def _get_typeshed_directories(version_info):
+    index = _get_index()
+    check_version_list = ['2and3', '3']
+    for base in ['stdlib', 'third_party']:
+        base_path = TYPESHED_PATH.joinpath(base)
+        if index:
+            base_list = [d.split('/')[1] for d in index if d.startswith(base + '/')]
+        else:
+            base_list = os.listdir(base_path)
+        for base_list_entry in base_list:
+            match = re.match(r'(\d+)\.(\d+)$', base_list_entry)
+            if match is not None:
+                if match.group(1) == '3' and int(match.group(2)) <= version_info.minor:
+                    check_version_list.append(base_list_entry)
+        for check_version in check_version_list:
+            is_third_party = base != 'stdlib'
+            yield PathInfo(str(base_path.joinpath(check_version)), is_third_party)
 _version_cache: Dict[Tuple[int, int], Mapping[str, PathInfo]] = {}
 
 def _cache_stub_file_map(version_info):
     """
     Returns a map of an importable name in Python to a stub file.
     """
-    pass
+    version = version_info[:2]
+    try:
+        return _version_cache[version]
+    except KeyError:
+        pass
+    _version_cache[version] = file_set = \
+        _merge_create_stub_map(_get_typeshed_directories(version_info))
+    return file_set
 
 def _try_to_load_stub(inference_state, import_names, python_value_set, parent_module_value, sys_path):
     """
@@ -36,4 +92,40 @@ def _try_to_load_stub(inference_state, import_names, python_value_set, parent_mo
     This is modelled to work like "PEP 561 -- Distributing and Packaging Type
     Information", see https://www.python.org/dev/peps/pep-0561.
     """
-    pass
\ No newline at end of file
+    pass
+
+def _load_parsed_stub(grammar, file_io):
+    """
+    Returns the tree of a stub that was parsed at install time, see
+    :func:`typeshed_index.write_tree_cache`, and adds it to parso's cache.
+    """
+    global _tree_cache
+    if _tree_cache is None:
+        _tree_cache = typeshed_index.load_tree_cache(_TREE_CACHE_PATH, grammar) or {}
+    path = file_io.path
+    try:
+        relative_path = Path(path).relative_to(TYPESHED_PATH.parent).as_posix()
+        content_hash, pickled = _tree_cache[relative_path]
+    except (ValueError, KeyError):
+        return None
+    with get_parser_lock(path):
+        if path in parser_cache.get(grammar._hashed, {}):
+            # Parso takes care of it.
+            return None
+        if hashlib.sha256(file_io.read()).hexdigest() != content_hash:
+            return None
+        module, lines = pickle.loads(pickled)
+        try_to_save_module(grammar._hashed, file_io, module, lines, pickling=False)
+    return module
+
+def parse_stub_module(inference_state, file_io):
+    module = _load_parsed_stub(inference_state.latest_grammar, file_io)
+    if module is not None:
+        return module
+    return inference_state.parse(
+        file_io=file_io,
+        cache=True,
+        diff_cache=settings.fast_parser,
+        cache_path=settings.cache_directory,
+        use_latest_grammar=True,
+    )
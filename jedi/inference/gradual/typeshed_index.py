@@ -0,0 +1,142 @@
+"""
+Finding the stub files in typeshed means listing hundreds of directories,
+which is slow in every new process. The stub files of the bundled typeshed
+therefore get listed once when Jedi is installed (see ``setup.py``) and are
+saved in an index next to typeshed.
+
+The same goes for parsing: Stubs like ``builtins`` and ``typing`` are needed
+for almost every completion, so their syntax trees are parsed at install time
+as well and shipped in a tree cache.
+
+This module must not import anything from Jedi, because it's also used by
+``setup.py``, where Jedi's dependencies might not be installed yet.
+"""
+import hashlib
+import json
+import os
+import pickle
+
+INDEX_NAME = 'typeshed-index.json'
+TREE_CACHE_NAME = 'typeshed-trees.pickle'
+_VERSION = 1
+_PICKLE_PROTOCOL = 4
+# Stubs are parsed with the latest grammar, see ``InferenceState.latest_grammar``.
+STUB_GRAMMAR_VERSION = '3.12'
+# The stdlib modules whose stubs are parsed at install time.
+PARSED_STUBS = (
+    'builtins', 'typing', 'typing_extensions', 'types', 'abc', 'collections',
+    'enum', 'functools', 'itertools', 'os', 'sys', 're', 'json', 'pathlib',
+    'datetime', 'subprocess',
+)
+
+
+def list_stub_directory(path):
+    """
+    Returns a mapping of an importable name in Python to the stub file of it,
+    relative to ``path``.
+    """
+    try:
+        listed = os.listdir(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return {}
+
+    stubs = {}
+    for entry in listed:
+        entry_path = os.path.join(path, entry)
+        if os.path.isdir(entry_path):
+            if os.path.isfile(os.path.join(entry_path, '__init__.pyi')):
+                stubs[entry] = os.path.join(entry, '__init__.pyi')
+        elif entry.endswith('.pyi') and os.path.isfile(entry_path):
+            name = entry[:-4]
+            if name != '__init__':
+                stubs[name] = entry
+    return stubs
+
+
+def create_index(typeshed_path):
+    """
+    Lists the stub files of all version directories of typeshed, e.g.
+    ``{'stdlib/3.7': {'contextvars': 'contextvars.pyi'}}``.
+    """
+    directories = {}
+    for base in ('stdlib', 'third_party'):
+        base_path = os.path.join(typeshed_path, base)
+        for entry in sorted(os.listdir(base_path)):
+            directories[base + '/' + entry] = list_stub_directory(os.path.join(base_path, entry))
+    return directories
+
+
+def write_index(typeshed_path, index_path):
+    with open(index_path, 'w') as f:
+        json.dump({'version': _VERSION, 'directories': create_index(typeshed_path)}, f)
+
+
+def load_index(index_path):
+    """
+    Returns the index that was written by :func:`write_index` or None if
+    there's no usable index.
+    """
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get('version') != _VERSION:
+        return None
+    return index['directories']
+
+
+def _get_tree_cache_stamp(grammar):
+    import parso
+    return _VERSION, parso.__version__, grammar._hashed
+
+
+def write_tree_cache(third_party_path, cache_path):
+    """
+    Parses the stubs of :data:`PARSED_STUBS` with the grammar that Jedi uses
+    for stubs and saves the syntax trees. Paths are relative to
+    ``third_party_path``.
+    """
+    import parso
+    from parso.utils import python_bytes_to_unicode, split_lines
+
+    # Has to match ``InferenceState.latest_grammar``, otherwise the trees are
+    # never used.
+    grammar = parso.load_grammar(version=STUB_GRAMMAR_VERSION)
+    trees = {}
+    for directory, stubs in create_index(os.path.join(third_party_path, 'typeshed')).items():
+        if not directory.startswith('stdlib/'):
+            continue
+        for name, stub in stubs.items():
+            if name not in PARSED_STUBS:
+                continue
+            relative_path = 'typeshed/%s/%s' % (directory, stub.replace(os.path.sep, '/'))
+            with open(os.path.join(third_party_path, relative_path), 'rb') as f:
+                content = f.read()
+            code = python_bytes_to_unicode(content)
+            module = grammar.parse(code)
+            lines = split_lines(code, keepends=True)
+            trees[relative_path] = (
+                hashlib.sha256(content).hexdigest(),
+                # Pickled separately, so only the trees that are needed are loaded.
+                pickle.dumps((module, lines), _PICKLE_PROTOCOL),
+            )
+
+    with open(cache_path, 'wb') as f:
+        pickle.dump((_get_tree_cache_stamp(grammar), trees), f, _PICKLE_PROTOCOL)
+
+
+def load_tree_cache(cache_path, grammar):
+    """
+    Returns the trees that were written by :func:`write_tree_cache` as a
+    mapping of a relative path to its content hash and its pickled tree and
+    lines, or None if they were not parsed by the same parso and grammar.
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            stamp, trees = pickle.load(f)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        return None
+    if stamp != _get_tree_cache_stamp(grammar):
+        return None
+    return trees
@@ -9,6 +9,7 @@ This module also supports import autocompletion, which means to complete
 statements like ``from datetim`` (cursor at the end would return ``datetime``).
 """
 import os
+from collections import OrderedDict
 from pathlib import Path
 from parso.python import tree
 from parso.tree import search_ancestor
@@ -31,7 +32,49 @@ from jedi.plugins import plugin_manager
 class ModuleCache:
 
     def __init__(self):
-        self._name_cache = {}
+        # Least recently used modules first.
+        self._name_cache = OrderedDict()
+
+    def add(self, string_names, value_set):
+        if string_names is not None:
+            self._name_cache[string_names] = value_set
+            self._name_cache.move_to_end(string_names)
+
+    def get(self, string_names):
+        value_set = self._name_cache.get(string_names)
+        if value_set is not None:
+            self._name_cache.move_to_end(string_names)
+        return value_set
+
+    def invalidate_path(self, path):
+        """
+        Removes all modules from the cache that were loaded from ``path``.
+        """
+        for string_names, value_set in list(self._name_cache.items()):
+            if any(value.py__file__() == path for value in value_set):
+                del self._name_cache[string_names]
+
+    def __len__(self):
+        return len(self._name_cache)
+
+    def evict(self, count):
+        """
+        Removes up to ``count`` of the least recently used modules. The
+        modules ``builtins`` and ``typing`` are essential and always kept.
+
+        :returns: The paths of the removed modules.
+        """
+        candidates = [
+            string_names for string_names in self._name_cache
+            if string_names not in (('builtins',), ('typing',))
+        ][:count]
+        paths = []
+        for string_names in candidates:
+            for value in self._name_cache.pop(string_names):
+                path = value.py__file__()
+                if path is not None:
+                    paths.append(path)
+        return paths
 
 def _level_to_base_import_path(project_path, directory, level):
     """
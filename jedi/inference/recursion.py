@@ -3,9 +3,9 @@ Recursions are the recipe of |jedi| to conquer Python code. However, someone
 must stop recursions going mad. Some settings are here to make |jedi| stop at
 the right time. You can read more about them :ref:`here <settings-recursion>`.
 
-Next to the internal ``jedi.inference.cache`` this module also makes |jedi| not
-thread-safe, because ``execution_recursion_decorator`` uses class variables to
-count the function calls.
+The recursion counters as well as the caches of ``jedi.inference.cache`` live
+on the inference state. An inference state is therefore only ever used by one
+thread at a time, see ``InferenceState.lock``.
 
 .. _settings-recursion:
 
@@ -1,8 +1,8 @@
 import os
 import re
-from parso import python_bytes_to_unicode
+from pathlib import Path
 from jedi.debug import dbg
-from jedi.file_io import KnownContentFileIO, FolderIO
+from jedi.file_io import FileIO
 from jedi.inference.names import SubModuleName
 from jedi.inference.imports import load_module_from_path
 from jedi.inference.filters import ParserTreeFilter
@@ -15,9 +15,179 @@ _PARSED_FILE_LIMIT = 30
 
 def get_module_contexts_containing_name(inference_state, module_contexts, name, limit_reduction=1):
     """
-    Search a name in the directories of modules.
+    Search a name in the project folder. This is used while
+    inferring (e.g. for dynamic params), so only a limited amount of files is
+    parsed. The symbol index of the project is used if it already exists,
+    otherwise a limited amount of files is read.
 
     :param limit_reduction: Divides the limits on opening/parsing files by this
         factor.
     """
-    pass
\ No newline at end of file
+    from jedi.inference.symbol_index import get_loaded_symbol_index
+
+    def find_paths(folder):
+        # Indexing or updating the index of a whole project is too slow here,
+        # an index that might be a few seconds old is good enough.
+        index = get_loaded_symbol_index(folder)
+        if index is None:
+            return _find_files_containing(folder, name, _OPENED_FILE_LIMIT / limit_reduction)
+        return index.find_paths_containing(name)
+
+    return _iter_module_contexts(
+        inference_state, module_contexts, name, find_paths,
+        parse_limit=_PARSED_FILE_LIMIT / limit_reduction,
+    )
+
+
+def _find_files_containing(folder, name, open_limit):
+    regex = re.compile(r'\b' + re.escape(name) + r'\b')
+    opened_count = 0
+    for root, dirnames, filenames in os.walk(folder):
+        dirnames[:] = [d for d in dirnames if d not in _IGNORE_FOLDERS]
+        for filename in filenames:
+            if not filename.endswith('.py'):
+                continue
+            if opened_count >= open_limit:
+                dbg('Hit limit of opened files: %s', open_limit)
+                return
+            opened_count += 1
+            path = os.path.join(root, filename)
+            try:
+                with open(path, 'rb') as f:
+                    code = f.read().decode('utf-8', 'replace')
+            except OSError:
+                continue
+            if regex.search(code) is not None:
+                yield path
+
+
+def _iter_module_contexts(inference_state, module_contexts, name, find_paths, parse_limit=None):
+    # Skip non python modules
+    for module_context in module_contexts:
+        if module_context.is_compiled():
+            continue
+        yield module_context
+
+    # Very short names are not searched in other modules for now to avoid lots
+    # of file lookups.
+    if len(name) <= 2:
+        return
+
+    known_paths = {m.py__file__() for m in module_contexts}
+    parsed_count = 0
+    # The project is searched even if the name is defined somewhere else,
+    # e.g. in site-packages or in a script without a path.
+    for path in find_paths(inference_state.project.path):
+        if Path(path) in known_paths:
+            continue
+        if parse_limit is not None and parsed_count >= parse_limit:
+            dbg('Hit limit of parsed files: %s', parse_limit)
+            return
+        parsed_count += 1
+        m = load_module_from_path(inference_state, FileIO(path))
+        if m.is_compiled():
+            continue
+        yield m.as_context()
+
+
+def iter_module_contexts_containing_name(inference_state, module_contexts, name):
+    """
+    Like :func:`get_module_contexts_containing_name`, but without limits. All
+    files that contain the name are found with the symbol index of the
+    project, so no file has to be read just to find out that the name is not
+    in there. This is what references need.
+    """
+    from jedi.inference.symbol_index import get_symbol_index
+
+    def find_paths(folder):
+        index = get_symbol_index(inference_state, folder)
+        paths = index.find_paths_containing(name)
+        dbg('Found %s files containing %s in %s', len(paths), name, folder)
+        return paths
+
+    return _iter_module_contexts(inference_state, module_contexts, name, find_paths)
+
+
+def iter_references(module_context, tree_name, only_in_module=False, should_stop=None):
+    """
+    Yields the names that reference the same thing as ``tree_name``. Names are
+    yielded as soon as it's clear that they belong to the references, so the
+    first ones are available before all modules are searched.
+
+    :param should_stop: A callable that is checked before every module. The
+        search ends once it returns True. Closing the generator works as well.
+    """
+    for names in iter_reference_batches(module_context, tree_name, only_in_module, should_stop):
+        yield from names
+
+
+def iter_reference_batches(module_context, tree_name, only_in_module=False, should_stop=None):
+    """
+    Like :func:`iter_references`, but yields the names of one module at a
+    time. Between two batches nothing is being inferred, so the inference
+    state can be used for something else.
+    """
+    inf = module_context.inference_state
+    search_name = tree_name.value
+
+    # We disable flow analysis, because if we have ifs that are only true in
+    # certain cases, we want both sides.
+    try:
+        inf.flow_analysis_enabled = False
+        found_names = _find_defining_names(module_context, tree_name)
+    finally:
+        inf.flow_analysis_enabled = True
+
+    found_names_dct = _dictionarize(found_names)
+
+    def found(names):
+        return [
+            name for name in names
+            if not only_in_module or name.get_root_context() == module_context
+        ]
+
+    yield found(found_names_dct.values())
+
+    module_contexts = [module_context]
+    if not only_in_module:
+        for m in set(d.get_root_context() for d in found_names):
+            if m != module_context and m.tree_node is not None \
+                    and inf.project.path in m.py__file__().parents:
+                module_contexts.append(m)
+    # For param no search for other modules is necessary.
+    if only_in_module or any(n.api_type == 'param' for n in found_names):
+        potential_modules = module_contexts
+    else:
+        potential_modules = iter_module_contexts_containing_name(
+            inf,
+            module_contexts,
+            search_name,
+        )
+
+    non_matching_reference_maps = {}
+    for module_context in potential_modules:
+        if should_stop is not None and should_stop():
+            dbg('Stopped searching references of %s', search_name)
+            return
+        names = []
+        for name_leaf in module_context.tree_node.get_used_names().get(search_name, []):
+            new = _dictionarize(_find_names(module_context, name_leaf))
+            if any(tree_name in found_names_dct for tree_name in new):
+                merged = dict(new)
+                for tree_name in new:
+                    for dct in non_matching_reference_maps.pop(tree_name, []):
+                        # A reference that was previously searched for matches
+                        # with a now found name. Merge.
+                        merged.update(dct)
+                merged = {k: v for k, v in merged.items() if k not in found_names_dct}
+                found_names_dct.update(merged)
+                names += found(merged.values())
+            else:
+                for name in new:
+                    non_matching_reference_maps.setdefault(name, []).append(new)
+        if names:
+            yield names
+
+
+def find_references(module_context, tree_name, only_in_module=False):
+    return list(iter_references(module_context, tree_name, only_in_module))
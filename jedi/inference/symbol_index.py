@@ -0,0 +1,542 @@
+"""
+Searching a whole project means looking at every single file of the project.
+For big projects this is way too slow to do for every search. This module
+keeps an index of all the definitions of a project: Their name, type,
+qualified name and position. It also knows which identifiers appear in which
+file, which is what references need.
+
+The index is persisted in :data:`jedi.settings.cache_directory`. Only files
+whose modification time or size changed since the last search are parsed
+again and only their entries are replaced. The project is walked to find
+these files at most every few seconds, files that are known to have changed
+(e.g. by :meth:`.Session.invalidate`) are looked at right away.
+
+Prefix searches use a sorted array of all names. Fuzzy searches first
+intersect the names that contain every character of the search string and
+only check those.
+
+Indexes are shared by all threads. Updates are serialised, files are parsed
+without blocking searches and added to the index chunk by chunk.
+"""
+import hashlib
+import multiprocessing
+import os
+import re
+import sys
+import time
+from bisect import bisect_left, insort
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from threading import Lock, RLock
+from typing import Dict, FrozenSet, List, Set, Tuple
+
+import parso
+
+from jedi import debug
+from jedi import settings
+from jedi._compatibility import pickle_dump, pickle_load
+from jedi.inference.references import _IGNORE_FOLDERS
+from jedi.inference.utils import fuzzy_match
+
+_VERSION = 3
+_PICKLE_PROTOCOL = 4
+_IDENTIFIER = re.compile(r'[^\W\d]\w*')
+# Starting processes is only worth it if there are enough files to parse,
+# e.g. when a project is indexed for the first time.
+_PARALLEL_FILE_COUNT = 200
+_MAX_PROCESSES = 8
+# The results of this many files are added to the index at once.
+_CHUNK_SIZE = 32
+# Walking a big project takes a while, so it's not done for every search.
+_WALK_INTERVAL = 5.0
+# Above this, sorting all names again is faster than inserting them.
+_MAX_SORTED_INSERTIONS = 100
+
+Symbol = namedtuple('Symbol', 'name type full_name line column is_top_level')
+# The lower the rank, the better the match.
+SymbolMatch = namedtuple('SymbolMatch', 'path symbol rank')
+# (modification time, size, symbols, identifiers)
+FileEntry = Tuple[float, int, List[Symbol], FrozenSet[str]]
+
+_DEFINITION_TYPES = {
+    'funcdef': 'function',
+    'classdef': 'class',
+    'param': 'param',
+    # Imported modules are removed by the search, other imported names (e.g.
+    # re-exports) are found like upstream.
+    'import_from': 'import',
+    'import_name': 'import',
+}
+
+_indexes: Dict[str, 'SymbolIndex'] = {}
+_indexes_lock = Lock()
+_save_executor = None
+
+
+def get_rank(name, string):
+    """
+    Returns how well the lower case ``string`` matches ``name``: Exact matches
+    come first, followed by prefixes, substrings and fuzzy matches. Shorter
+    names are preferred.
+    """
+    name = name.lower()
+    if name == string:
+        category = 0
+    elif name.startswith(string):
+        category = 1
+    elif string in name:
+        category = 2
+    else:
+        category = 3
+    return category, len(name)
+
+
+def _get_local_names(name):
+    local_names = [name.value]
+    node = name.parent
+    while node is not None:
+        if node.type in ('funcdef', 'classdef') and node.name is not name:
+            local_names.insert(0, node.name.value)
+        node = node.parent
+    return local_names
+
+
+def _get_module_names(project_path, path):
+    parts = list(Path(path).relative_to(project_path).with_suffix('').parts)
+    if parts[-1] == '__init__':
+        parts.pop()
+    return parts
+
+
+def _iter_symbols(module, module_names):
+    for names in module.get_used_names().values():
+        for name in names:
+            if not name.is_definition():
+                continue
+            definition = name.get_definition(import_name_always=True)
+            if definition is None:
+                continue
+
+            local_names = _get_local_names(name)
+            yield Symbol(
+                name.value,
+                _DEFINITION_TYPES.get(definition.type, 'statement'),
+                '.'.join(module_names + local_names),
+                name.line,
+                name.column,
+                len(local_names) == 1,
+            )
+
+
+def _index_file(grammar, project_path, path):
+    try:
+        with open(path, 'rb') as f:
+            code = parso.python_bytes_to_unicode(f.read(), errors='replace')
+    except OSError:
+        return [], frozenset()
+    module = grammar.parse(code, error_recovery=True)
+    module_names = _get_module_names(project_path, path)
+    return list(_iter_symbols(module, module_names)), frozenset(_IDENTIFIER.findall(code))
+
+
+def _index_files_worker(version, project_path, paths):
+    grammar = parso.load_grammar(version=version)
+    results = []
+    for path in paths:
+        try:
+            results.append(_index_file(grammar, project_path, path))
+        except Exception:
+            # The file is indexed again in the main process, where the error
+            # is visible.
+            results.append(None)
+    return results
+
+
+def _create_process_pool():
+    # Forking a process that runs other threads (e.g. the one that saves the
+    # indexes) can deadlock, so the processes are started from scratch.
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+    else:
+        context = multiprocessing.get_context('spawn')
+    return ProcessPoolExecutor(
+        max_workers=min(os.cpu_count() or 1, _MAX_PROCESSES),
+        mp_context=context,
+    )
+
+
+def _iter_indexed_files(grammar, project_path, paths):
+    """
+    Yields lists of paths with their symbols and identifiers, as soon as the
+    files of a chunk are indexed. Many files are read and parsed in parallel
+    by a process pool.
+    """
+    chunks = [paths[i:i + _CHUNK_SIZE] for i in range(0, len(paths), _CHUNK_SIZE)]
+    if len(paths) >= _PARALLEL_FILE_COUNT:
+        version = '%s.%s' % grammar.version_info[:2]
+        # The paths that are yielded or left to the serial indexing below.
+        handled = set()
+        serial = []
+        try:
+            with _create_process_pool() as executor:
+                futures = {
+                    executor.submit(_index_files_worker, version, project_path, chunk): chunk
+                    for chunk in chunks
+                }
+                for future in as_completed(futures):
+                    chunk = futures[future]
+                    try:
+                        results = future.result()
+                    except BrokenProcessPool as e:
+                        debug.warning('The processes for indexing files broke: %r', e)
+                        results = [None] * len(chunk)
+                    handled.update(chunk)
+                    # Files that failed in a worker are indexed again below.
+                    serial += [path for path, result in zip(chunk, results) if result is None]
+                    yield [(path, result) for path, result in zip(chunk, results)
+                           if result is not None]
+        except (OSError, RuntimeError) as e:
+            # E.g. in environments where processes cannot be started.
+            debug.warning('Could not index files in parallel: %r', e)
+            serial += [path for path in paths if path not in handled]
+        chunks = [serial[i:i + _CHUNK_SIZE] for i in range(0, len(serial), _CHUNK_SIZE)]
+    for chunk in chunks:
+        yield [(path, _index_file(grammar, project_path, path)) for path in chunk]
+
+
+class SymbolIndex:
+    """
+    The definitions of all Python files in a project folder.
+    """
+    def __init__(self, project_path):
+        self._project_path = Path(project_path)
+        self._files: Dict[str, FileEntry] = {}
+        # name -> path -> symbols
+        self._by_name: Dict[str, Dict[str, List[Symbol]]] = {}
+        self._paths_by_identifier: Dict[str, Set[str]] = {}
+        self._sorted_names: List[str] = []
+        self._names_by_character: Dict[str, Set[str]] = {}
+        self._loaded = False
+        self._last_walk = None
+        self._invalidated: Set[str] = set()
+        self._save_future = None
+        self._lock = RLock()
+        self._update_lock = Lock()
+
+    def _get_cache_path(self):
+        project_hash = hashlib.sha256(str(self._project_path).encode('utf-8')).hexdigest()
+        return Path(settings.cache_directory).joinpath(
+            'symbol-index-%s' % _VERSION,
+            project_hash[:16] + '.pickle',
+        )
+
+    def _load(self):
+        self._loaded = True
+        try:
+            with open(self._get_cache_path(), 'rb') as f:
+                version, project_path, files = pickle_load(f)
+        except (OSError, EOFError, ValueError) as e:
+            debug.dbg('No symbol index for %s: %r', self._project_path, e)
+            return
+        if version == _VERSION and project_path == str(self._project_path):
+            new_names = set()
+            for path, entry in files.items():
+                self._add_file(path, entry, new_names)
+            self._update_sorted_names(new_names, ())
+
+    def _save(self):
+        """
+        Writes the index in a background thread, so requests don't wait for
+        it. The thread is joined when the process exits.
+        """
+        global _save_executor
+        with _indexes_lock:
+            if _save_executor is None:
+                _save_executor = ThreadPoolExecutor(1, thread_name_prefix='jedi-symbol-index')
+        self._save_future = _save_executor.submit(
+            _write_index,
+            self._get_cache_path(),
+            str(self._project_path),
+            # Entries are immutable, a shallow copy is enough.
+            dict(self._files),
+        )
+
+    def _iter_files(self):
+        for root, dirnames, filenames in os.walk(self._project_path):
+            dirnames[:] = [d for d in dirnames if d not in _IGNORE_FOLDERS]
+            for filename in filenames:
+                if filename.endswith(('.py', '.pyi')):
+                    path = os.path.join(root, filename)
+                    stat = _get_stat(path)
+                    if stat is not None:
+                        yield path, stat
+
+    def _iter_invalidated_files(self):
+        for path in self._invalidated:
+            try:
+                parts = Path(path).relative_to(self._project_path).parts
+            except ValueError:
+                continue
+            if path.endswith(('.py', '.pyi')) and not set(parts) & set(_IGNORE_FOLDERS):
+                yield path, _get_stat(path)
+
+    def _add_file(self, path, entry, new_names):
+        self._files[path] = entry
+        _, _, symbols, identifiers = entry
+        for symbol in symbols:
+            name = symbol.name.lower()
+            paths = self._by_name.get(name)
+            if paths is None:
+                paths = self._by_name[name] = {}
+                new_names.add(name)
+            paths.setdefault(path, []).append(symbol)
+        for identifier in identifiers:
+            self._paths_by_identifier.setdefault(identifier, set()).add(path)
+
+    def _remove_file(self, path, removed_names):
+        entry = self._files.pop(path, None)
+        if entry is None:
+            return
+        _, _, symbols, identifiers = entry
+        for symbol in symbols:
+            name = symbol.name.lower()
+            paths = self._by_name.get(name)
+            if paths is not None and paths.pop(path, None) is not None and not paths:
+                del self._by_name[name]
+                removed_names.add(name)
+        for identifier in identifiers:
+            paths = self._paths_by_identifier.get(identifier)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self._paths_by_identifier[identifier]
+
+    def _is_sorted_name(self, name):
+        i = bisect_left(self._sorted_names, name)
+        return i < len(self._sorted_names) and self._sorted_names[i] == name
+
+    def _update_sorted_names(self, new_names, removed_names):
+        # A name can be removed and added again in the same update.
+        to_add = []
+        to_remove = []
+        for name in new_names | removed_names:
+            is_sorted = self._is_sorted_name(name)
+            if name in self._by_name:
+                if not is_sorted:
+                    to_add.append(name)
+            elif is_sorted:
+                to_remove.append(name)
+
+        if len(to_add) + len(to_remove) > _MAX_SORTED_INSERTIONS:
+            removed = set(to_remove)
+            names = [name for name in self._sorted_names if name not in removed]
+            # Merging two sorted runs only takes linear time.
+            self._sorted_names = sorted(names + sorted(to_add))
+        else:
+            for name in to_remove:
+                del self._sorted_names[bisect_left(self._sorted_names, name)]
+            for name in to_add:
+                insort(self._sorted_names, name)
+        for name in to_remove:
+            for character in set(name):
+                self._names_by_character[character].discard(name)
+        for name in to_add:
+            for character in set(name):
+                self._names_by_character.setdefault(character, set()).add(name)
+
+    def invalidate(self, path):
+        """
+        Makes the next update look at ``path`` again, even if the project was
+        walked just before.
+        """
+        with self._lock:
+            self._invalidated.add(str(path))
+
+    def update(self, grammar):
+        """
+        Parses all files that were added or changed since the last update and
+        removes the ones that don't exist anymore.
+
+        The project is walked at most every few seconds, in between only the
+        paths given to :meth:`invalidate` are checked.
+        """
+        # Updates are serialised, but the files are parsed without holding the
+        # lock of the data, so searches can go on in the meantime.
+        with self._update_lock:
+            with self._lock:
+                changes = self._get_changes()
+                if changes is None:
+                    return
+                stats, changed, removed = changes
+                debug.dbg('Symbol index of %s: %s files changed',
+                          self._project_path, len(changed))
+                removed_names = set()
+                for path in removed:
+                    self._remove_file(path, removed_names)
+                self._update_sorted_names(set(), removed_names)
+
+            for results in _iter_indexed_files(grammar, self._project_path, changed):
+                with self._lock:
+                    new_names = set()
+                    removed_names = set()
+                    for path, (symbols, identifiers) in results:
+                        self._remove_file(path, removed_names)
+                        # Interned, so every identifier is only stored and
+                        # pickled once.
+                        entry = stats[path] + (symbols, frozenset(map(sys.intern, identifiers)))
+                        self._add_file(path, entry, new_names)
+                    self._update_sorted_names(new_names, removed_names)
+            with self._lock:
+                self._save()
+
+    def _get_changes(self):
+        if not self._loaded:
+            self._load()
+
+        now = time.monotonic()
+        if self._last_walk is None or now - self._last_walk >= _WALK_INTERVAL:
+            self._last_walk = now
+            stats = dict(self._iter_files())
+            removed = [path for path in self._files if path not in stats]
+        elif self._invalidated:
+            stats = {}
+            removed = []
+            for path, stat in self._iter_invalidated_files():
+                if stat is None:
+                    removed.append(path)
+                else:
+                    stats[path] = stat
+        else:
+            return None
+        self._invalidated.clear()
+
+        changed = []
+        for path, stat in stats.items():
+            entry = self._files.get(path)
+            if entry is None or entry[:2] != stat:
+                changed.append(path)
+        if not changed and not any(path in self._files for path in removed):
+            return None
+        return stats, changed, removed
+
+    @property
+    def paths(self):
+        """
+        All indexed file paths.
+        """
+        with self._lock:
+            return list(self._files)
+
+    def find_paths_containing(self, identifier):
+        """
+        Returns the paths of all files in which ``identifier`` appears, no
+        matter if it's a definition or a usage.
+        """
+        with self._lock:
+            return sorted(self._paths_by_identifier.get(identifier, ()))
+
+    def count_paths_containing(self, identifier):
+        """
+        Returns the amount of files in which ``identifier`` appears, see
+        :meth:`find_paths_containing`.
+        """
+        with self._lock:
+            return len(self._paths_by_identifier.get(identifier, ()))
+
+    def _get_matching_names(self, string, complete, fuzzy):
+        if not complete:
+            return [string] if string in self._by_name else []
+        if not fuzzy or not string:
+            names = []
+            for i in range(bisect_left(self._sorted_names, string), len(self._sorted_names)):
+                name = self._sorted_names[i]
+                if not name.startswith(string):
+                    break
+                names.append(name)
+            return names
+
+        candidates = sorted(
+            (self._names_by_character.get(character, set()) for character in set(string)),
+            key=len,
+        )
+        return [
+            name for name in set.intersection(*candidates)
+            if fuzzy_match(name, string)
+        ]
+
+    def find(self, string, *, complete=False, fuzzy=False, all_scopes=False):
+        """
+        Returns the :class:`SymbolMatch` of all definitions that match
+        ``string``, the best matches first (see :func:`get_rank`). Matching
+        works like :meth:`.Project.search`: it is case insensitive and
+        ``complete`` matches prefixes (or with ``fuzzy`` subsequences).
+        """
+        string = string.lower()
+        with self._lock:
+            matches = [
+                SymbolMatch(path, symbol, get_rank(name, string))
+                for name in self._get_matching_names(string, complete, fuzzy)
+                for path, symbols in self._by_name[name].items()
+                for symbol in symbols
+                if all_scopes or symbol.is_top_level
+            ]
+        matches.sort(key=lambda m: (m.rank, m.symbol.full_name))
+        return matches
+
+
+def _get_stat(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime, stat.st_size
+
+
+def _write_index(path, project_path, files):
+    tmp_path = path.with_suffix('.tmp%s' % os.getpid())
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle_dump((_VERSION, project_path, files), f, _PICKLE_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        debug.warning('Could not write the symbol index of %s: %r', project_path, e)
+
+
+def get_symbol_index(inference_state, project_path):
+    """
+    Returns the up to date index of a project folder.
+    """
+    key = str(project_path)
+    with _indexes_lock:
+        try:
+            index = _indexes[key]
+        except KeyError:
+            index = _indexes[key] = SymbolIndex(project_path)
+    index.update(inference_state.grammar)
+    return index
+
+
+def invalidate_path(path):
+    """
+    Tells the indexes of this process that contain ``path`` that it changed,
+    see :meth:`SymbolIndex.invalidate`.
+    """
+    path = Path(path)
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        if index._project_path in path.parents:
+            index.invalidate(path)
+
+
+def get_loaded_symbol_index(project_path):
+    """
+    Returns the index of a project folder without updating it, or None if it
+    wasn't created in this process. For places where walking the project
+    would be too slow, e.g. ranking completions.
+    """
+    with _indexes_lock:
+        return _indexes.get(str(project_path))
@@ -40,6 +40,8 @@ def _limit_value_infers(func):
     """
     def wrapper(*args, **kwargs):
         inference_state = args[0].inference_state
+        if inference_state.is_stopped():
+            return NO_VALUES
         try:
             inference_state.inferred_element_counts[func] += 1
             if inference_state.inferred_element_counts[func] > 300:
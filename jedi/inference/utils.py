@@ -57,4 +57,12 @@ class PushBackIterator:
             self.current = self.pushes.pop()
         else:
             self.current = next(self.iterator)
-        return self.current
\ No newline at end of file
+        return self.current
+
+def fuzzy_match(string, like_name):
+    """
+    Returns whether all characters of ``like_name`` appear in ``string`` in
+    the same order, e.g. ``ooa`` in ``foobar``.
+    """
+    characters = iter(string)
+    return all(character in characters for character in like_name)
@@ -43,7 +43,15 @@ Dynamic stuff
 Caching
 ~~~~~~~
 
-.. autodata:: call_signatures_validity
+.. autodata:: inference_cache_limit
+.. autodata:: completion_cache_limit
+
+
+Subprocesses
+~~~~~~~~~~~~
+
+.. autodata:: compiled_subprocess_count
+.. autodata:: compiled_subprocess_transport
 
 
 """
@@ -78,4 +86,12 @@ auto_import_modules = ['gi']
 allow_unsafe_interpreter_executions = True
 '\nControls whether descriptors are evaluated when using an Interpreter. This is\nsomething you might want to control when using Jedi from a Repl (e.g. IPython)\n\nGenerally this setting allows Jedi to execute __getitem__ and descriptors like\n`property`.\n'
 call_signatures_validity = 3.0
-'\nFinding function calls might be slow (0.1-0.5s). This is not acceptible for\nnormal writing. Therefore cache it for a short time.\n'
\ No newline at end of file
+'\nNot used anymore. Signatures are cached until the code around the call or the\ndefinition of the function changes.\n'
+inference_cache_limit = 1000000
+'\nThe maximum amount of entries the caches of an inference state (memoized\nresults, modules and compiled objects) may hold. This matters mostly for\nlong living :class:`.Session` objects. If the limit is reached, the least\nrecently used entries are removed. ``None`` disables the limit.\n\nThe current sizes are available with :meth:`.Session.get_cache_sizes`.\n'
+completion_cache_limit = 100000
+"\nThe maximum amount of completions whose type, docstring signature and\ndocstring are kept in memory, see :meth:`.Script.resolve_completions`. The\ncache is shared by all scripts. If the limit is reached, the entries of the\nleast recently used modules are written to disk and removed from memory.\n"
+compiled_subprocess_count = 1
+'\nThe amount of subprocesses that are used per :class:`.Environment` to\ninspect compiled objects. Every inference state uses one of them, so\n:class:`.Script` objects that are used in different threads can work in\nparallel with more than one subprocess.\n'
+compiled_subprocess_transport = 'pipe'
+"\nHow messages are exchanged with the compiled subprocesses:\n\n- ``'pipe'``: Pickled directly to the pipes of the subprocess.\n- ``'framed'``: Length prefixed messages over the pipes. If the subprocess\n  runs the same Python version, responses that only contain tuples, lists,\n  strings, numbers and bools are encoded with :mod:`marshal`, which is\n  cheaper than pickle for small messages.\n- ``'socket'``: Like ``'framed'``, but over a socket pair instead of pipes.\n  Falls back to ``'framed'`` on systems without Unix sockets.\n\nThe setting is used when a subprocess is started.\n"
@@ -1,8 +1,10 @@
 #!/usr/bin/env python
 
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
 from setuptools.depends import get_module_constant
 
+import importlib.util
 import os
 
 __AUTHOR__ = 'David Halter'
@@ -18,6 +20,33 @@ assert os.path.isfile("jedi/third_party/typeshed/LICENSE"), \
 assert os.path.isfile("jedi/third_party/django-stubs/LICENSE.txt"), \
     "Please download the django-stubs submodule first (Hint: git submodule update --init)"
 
+
+class BuildPy(build_py):
+    """
+    Lists the stub files of typeshed and parses the most important ones once
+    at install time, so Jedi doesn't have to do it in every new process.
+    """
+    def run(self):
+        super().run()
+        # Loaded from its file, because Jedi's dependencies might be missing.
+        spec = importlib.util.spec_from_file_location(
+            'typeshed_index', 'jedi/inference/gradual/typeshed_index.py')
+        typeshed_index = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(typeshed_index)
+
+        target = os.path.join(self.build_lib, 'jedi', 'third_party', typeshed_index.INDEX_NAME)
+        self.mkpath(os.path.dirname(target))
+        typeshed_index.write_index('jedi/third_party/typeshed', target)
+
+        target = os.path.join(os.path.dirname(target), typeshed_index.TREE_CACHE_NAME)
+        try:
+            typeshed_index.write_tree_cache('jedi/third_party', target)
+        except ImportError:
+            # Parso is needed to parse the stubs. They are parsed on first use
+            # then.
+            self.warn('parso is not installed, typeshed stubs are not parsed')
+
+
 setup(name='jedi',
       version=version,
       description='An autocompletion tool for Python that can be used for text editors.',
@@ -34,6 +63,7 @@ setup(name='jedi',
       keywords='python completion refactoring vim',
       long_description=readme,
       packages=find_packages(exclude=['test', 'test.*']),
+      cmdclass={'build_py': BuildPy},
       python_requires='>=3.6',
       # Python 3.11 & 3.12 grammars are added to parso in 0.8.3
       install_requires=['parso>=0.8.3,<0.9.0'],
@@ -3,14 +3,17 @@ Test all things related to the ``jedi.api`` module.
 """
 
 import os
+from pathlib import Path
 from textwrap import dedent
 
+import parso
 import pytest
 from pytest import raises
 from parso import cache
 
-from jedi import preload_module
+from jedi import preload_module, preload_modules, settings
 from jedi.inference.gradual import typeshed
+from jedi.inference.gradual.typeshed_index import STUB_GRAMMAR_VERSION
 from test.helpers import test_dir, get_example_dir
 
 
@@ -41,6 +44,28 @@ def test_preload_modules():
         cache.parser_cache.update(old_cache)
 
 
+def test_preload_modules_in_parallel(tmp_path):
+    folder = tmp_path.joinpath('pkg')
+    folder.mkdir()
+    folder.joinpath('a.py').write_text('def foo(): pass\n')
+    folder.joinpath('b.pyi').write_text('def bar() -> int: ...\n')
+    folder.joinpath('c.txt').write_text('not python\n')
+
+    def count_pickles():
+        return len(list(Path(settings.cache_directory).glob('**/*.pkl')))
+
+    before = count_pickles()
+    errors = preload_modules(['json', 'does_not_exist_module'], paths=[folder], processes=2)
+    # Importing a module that doesn't exist is not an error, it just doesn't
+    # complete anything.
+    assert errors == []
+    # a.py, b.pyi and json itself.
+    assert count_pickles() >= before + 3
+    # Stubs are cached for the grammar they are loaded with.
+    stub_grammar = parso.load_grammar(version=STUB_GRAMMAR_VERSION)
+    assert list(Path(settings.cache_directory).glob('**/%s-*.pkl' % stub_grammar._hashed))
+
+
 def test_empty_script(Script):
     assert Script('')
 
@@ -403,3 +428,59 @@ def test_infer_after_parentheses(Script, code, column, expected):
         assert completions == []
     else:
         assert [c.name for c in completions] == [expected]
+
+
+def test_should_stop(Script):
+    script = Script('import os\nx = os.path\nx.joi')
+    assert not script.complete(should_stop=lambda: True)
+    assert not script.infer(2, 1, should_stop=lambda: True)
+    inference_state = script._inference_state
+    assert inference_state.should_stop is None
+    assert not inference_state.was_stopped
+
+    # The partial results of a stopped call are not reused.
+    assert [c.name for c in script.complete()] == ['join']
+    assert [d.name for d in script.infer(2, 1)] == ['path']
+
+    calls = []
+    script.infer(2, 1, should_stop=lambda: calls.append(1))
+    assert calls
+
+
+def test_should_stop_keeps_used_results(Script):
+    script = Script('import os\nx = os.path\nx.joi')
+    assert [c.name for c in script.complete()] == ['join']
+    memoize_cache = script._inference_state.memoize_cache
+    keys = {function: set(memo) for function, memo in memoize_cache.items()}
+
+    calls = []
+    # Stops after the cached results were used.
+    script.complete(should_stop=lambda: len(calls) > 5 or calls.append(1))
+    assert calls
+    # Only results that were created by the stopped call are removed.
+    for function, memo_keys in keys.items():
+        assert memo_keys <= set(memoize_cache[function])
+
+
+def test_complete_page(Script):
+    script = Script('import json; json.')
+    names = [c.name for c in script.complete()]
+    page = script.complete_page(count=3)
+    assert [c.name for c in page.completions] == names[:3]
+    assert page.total == len(names)
+    assert page.has_more
+
+    last = script.complete_page(start=page.total - 2, count=3)
+    assert [c.name for c in last.completions] == names[-2:]
+    assert not last.has_more
+
+
+def test_resolve_completions(Script):
+    script = Script('import json; json.lo')
+    completions = script.complete()
+    details = script.resolve_completions(completions)
+    assert [d.type for d in details] == ['function', 'function']
+    assert details[1].docstring == completions[1].docstring()
+    assert [s.name for s in details[1].signatures] == ['loads']
+
+    assert script.resolve_completions(completions, should_stop=lambda: True) == [None, None]
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+import pytest
+
+import jedi
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_async_script(environment):
+    script = jedi.AsyncScript('import json; json.lo', environment=environment)
+    completions = run(script.complete())
+    assert [c.name for c in completions] == ['load', 'loads']
+    definitions = run(script.infer(1, 8))
+    assert [d.name for d in definitions] == ['json']
+
+
+def test_async_script_cancel(environment):
+    started = threading.Event()
+    release = threading.Event()
+
+    def should_stop():
+        started.set()
+        # Keeps the inference busy until the task is cancelled.
+        release.wait(5)
+        return False
+
+    async def cancel():
+        script = jedi.AsyncScript('import os\nos.path.joi', environment=environment)
+        task = asyncio.ensure_future(script.complete(should_stop=should_stop))
+        while not started.is_set():
+            await asyncio.sleep(0.001)
+        task.cancel()
+        try:
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        finally:
+            release.set()
+
+    run(cancel())
@@ -4,6 +4,7 @@ from unittest import TestCase
 
 import pytest
 
+import jedi
 from jedi import cache
 from jedi.parser_utils import get_signature
 from jedi import Interpreter
@@ -658,3 +659,57 @@ def test_base_signatures(Script, code, line, column, name, index):
 
     assert sig.name == name
     assert sig.index == index
+
+
+def test_signature_cache(environment, tmp_path):
+    session = jedi.Session(jedi.Project(tmp_path), environment=environment)
+    path = tmp_path / 'module.py'
+
+    def get_params(code):
+        sig, = jedi.Script(code, path=path, session=session).get_signatures()
+        return [p.name for p in sig.params]
+
+    signature_cache = session._get_inference_state(path).signature_cache
+    assert get_params('def foo(a, b): pass\nfoo(') == ['a', 'b']
+    assert len(signature_cache) == 1
+    # Typing the arguments doesn't change the key.
+    assert get_params('def foo(a, b): pass\nfoo(1, ') == ['a', 'b']
+    assert len(signature_cache) == 1
+    # Changing the definition invalidates the cached callee.
+    assert get_params('def foo(x): pass\nfoo(1, ') == ['x']
+    assert len(signature_cache) == 1
+
+
+def test_signature_cache_scopes(environment, tmp_path):
+    session = jedi.Session(jedi.Project(tmp_path), environment=environment)
+    path = tmp_path / 'module.py'
+    code = 'def foo(a, b): pass\nfoo(\ndef g(foo):\n    foo('
+
+    sig, = jedi.Script(code, path=path, session=session).get_signatures(2, 4)
+    assert [p.name for p in sig.params] == ['a', 'b']
+    # The parameter ``foo`` is not the function ``foo``.
+    assert not jedi.Script(code, path=path, session=session).get_signatures(4, 8)
+
+
+def test_signature_cache_intermediate_modules(environment, tmp_path):
+    tmp_path.joinpath('defining.py').write_text('def foo(a): pass\ndef bar(b): pass\n')
+    reexporting = tmp_path.joinpath('reexporting.py')
+    reexporting.write_text('from defining import foo as func\n')
+    session = jedi.Session(jedi.Project(tmp_path), environment=environment)
+
+    def get_params():
+        script = jedi.Script('import reexporting\nreexporting.func(',
+                             path=tmp_path / 'main.py', session=session)
+        sig, = script.get_signatures()
+        return [p.name for p in sig.params]
+
+    assert get_params() == ['a']
+    inference_state = session._inference_state
+    (_, paths, _, _), = inference_state.signature_cache._dict.values()
+    # The module along the way is a dependency, not only the module of foo.
+    assert reexporting in paths
+
+    reexporting.write_text('from defining import bar as func\n')
+    session.invalidate(reexporting)
+    assert len(inference_state.signature_cache) == 0
+    assert get_params() == ['b']
@@ -2,11 +2,14 @@ from os.path import join, sep as s, dirname, expanduser
 import os
 from textwrap import dedent
 from itertools import count
+from collections import OrderedDict
 from pathlib import Path
 
 import pytest
 
+import jedi
 from ..helpers import root_dir
+from jedi.api import completion_cache
 from jedi.api.helpers import _start_match, _fuzzy_match
 from jedi.inference.imports import _load_python_module
 from jedi.file_io import KnownContentFileIO
@@ -451,6 +454,73 @@ def test_completion_cache(Script, module_injector):
     assert cls.docstring() == 'foo()\n\ndoc2'
 
 
+def test_persistent_completion_cache(environment, tmp_path, monkeypatch):
+    monkeypatch.setattr(completion_cache, '_cache', OrderedDict())
+    monkeypatch.setattr(completion_cache, '_module_keys', {})
+    monkeypatch.setattr(completion_cache, '_changed_modules', set())
+    monkeypatch.setattr(completion_cache, '_content_hashes', {})
+    numpy_path = tmp_path.joinpath('numpy.py')
+    numpy_path.write_text('def foo(a): "doc"\n')
+    project = jedi.Project(tmp_path)
+
+    def complete():
+        script = jedi.Script('import numpy; numpy.foo', project=project,
+                             environment=environment)
+        c, = script.complete()
+        return c
+
+    c = complete()
+    assert c.type == 'function'
+    completion_cache.flush()
+    assert list(Path(jedi.settings.cache_directory).glob('completion-*/*/numpy.pickle'))
+
+    # Simulate a restart.
+    completion_cache._cache.clear()
+    completion_cache._module_keys.clear()
+    c = complete()
+    assert completion_cache._cache['numpy']['foo'][0] == 'function'
+    assert c.docstring() == 'foo(a)\n\ndoc'
+
+    # Changing the module invalidates the persisted entries.
+    numpy_path.write_text('class foo: pass\n')
+    completion_cache._module_keys.clear()
+    c = complete()
+    assert c.type == 'class'
+
+
+def test_completion_cache_stopped(Script, monkeypatch):
+    monkeypatch.setattr(completion_cache, '_cache', OrderedDict())
+    monkeypatch.setattr(completion_cache, '_module_keys', {})
+    monkeypatch.setattr(completion_cache, '_changed_modules', set())
+    inference_state = Script('')._inference_state
+
+    # A stopped resolve returns partial values that are not cached.
+    with inference_state.stop_when(lambda: True):
+        assert inference_state.is_stopped()
+        type_ = completion_cache.get_type(
+            'numpy', 'foo', lambda: ('', '', ''), inference_state=inference_state)
+    assert type_ == ''
+    assert not completion_cache._cache.get('numpy')
+
+    type_ = completion_cache.get_type(
+        'numpy', 'foo', lambda: ('function', '', ''), inference_state=inference_state)
+    assert type_ == 'function'
+    assert completion_cache._cache['numpy']['foo'][0] == 'function'
+
+
+def test_completion_cache_limit(monkeypatch):
+    monkeypatch.setattr(completion_cache, '_cache', OrderedDict())
+    monkeypatch.setattr(completion_cache, '_module_keys', {})
+    monkeypatch.setattr(completion_cache, '_changed_modules', set())
+    monkeypatch.setattr(jedi.settings, 'completion_cache_limit', 3)
+    for module_name in ('numpy', 'pandas', 'numpy'):
+        for name in 'ab':
+            completion_cache.save_entry(module_name, name, ('function', '', ''))
+    # pandas was used least recently.
+    assert list(completion_cache._cache) == ['numpy']
+    assert completion_cache.get_type('numpy', 'a', None) == 'function'
+
+
 @pytest.mark.parametrize('module', ['typing', 'os'])
 def test_module_completions(Script, module):
     for c in Script('import {module}; {module}.'.format(module=module)).complete():
@@ -461,3 +531,25 @@ def test_module_completions(Script, module):
 
 def test_whitespace_at_end_after_dot(Script):
     assert 'strip' in [c.name for c in Script('str. ').complete()]
+
+
+def test_ranked_completions(Script):
+    code = dedent('''\
+        def foo():
+            alpha_local = 1
+            al
+        alpha_global = 2
+        ''')
+    names = [c.name for c in Script(code).complete(3, 6, ranked=True)]
+    assert names[:3] == ['alpha_local', 'alpha_global', 'all']
+
+    code = 'b_c_d = 1\nxbcd = 2\nbcdz = 3\nbcd'
+    completions = Script(code).complete(fuzzy=True, ranked=True)
+    names = [c.name for c in completions if c.name in ('b_c_d', 'xbcd', 'bcdz')]
+    assert names == ['bcdz', 'xbcd', 'b_c_d']
+
+
+def test_ranked_completions_by_type(Script):
+    code = "def f(x: int): pass\nname = ''\nnumber = 1\nf(n"
+    assert Script(code).complete()[0].name != 'number'
+    assert Script(code).complete(ranked=True)[0].name == 'number'
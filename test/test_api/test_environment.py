@@ -1,9 +1,11 @@
 import os
 import sys
+from io import BytesIO
 
 import pytest
 
 import jedi
+from jedi import settings
 from jedi.api.environment import get_default_environment, find_virtualenvs, \
     InvalidPythonEnvironment, find_system_environments, \
     get_system_environment, create_environment, InterpreterEnvironment, \
@@ -49,11 +51,54 @@ def test_load_module(inference_state):
     name, access_handle = access_path.accesses[0]
 
     assert access_handle.py__bool__() is True
+    assert access_handle.is_allowed_getattr('pi', safe=True) == (True, False, None)
     assert access_handle.get_api_type() == 'module'
     with pytest.raises(AttributeError):
         access_handle.py__mro__()
 
 
+def _load_math_handle(inference_state):
+    access_path = inference_state.compiled_subprocess.load_module(
+        dotted_name='math',
+        sys_path=inference_state.get_sys_path()
+    )
+    name, access_handle = access_path.accesses[0]
+    return access_handle
+
+
+def test_run_many(inference_state):
+    access_handle = _load_math_handle(inference_state)
+    (ok_exception, ok_result), (error_exception, error_result) = \
+        inference_state.compiled_subprocess.run_many([
+            ('get_compiled_method_return', (access_handle.id, 'get_api_type'), {}),
+            ('get_compiled_method_return', (access_handle.id, 'py__mro__'), {}),
+        ])
+    assert (ok_exception, ok_result) == (False, 'module')
+    assert error_exception is True
+    assert isinstance(error_result, AttributeError)
+
+
+def test_access_handle_prefetch(inference_state, monkeypatch):
+    access_handle = _load_math_handle(inference_state)
+    access_handle.prefetch([
+        ('get_api_type', (), {}),
+        ('py__bool__', (), {}),
+        ('py__mro__', (), {}),
+        ('is_allowed_getattr', ('pi',), {'safe': True}),
+    ])
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Should have been prefetched")
+
+    monkeypatch.setattr(access_handle._subprocess, 'get_compiled_method_return', fail)
+    assert access_handle.get_api_type() == 'module'
+    assert access_handle.py__bool__() is True
+    assert access_handle.is_allowed_getattr('pi', safe=True) == (True, False, None)
+    # Errors are not cached and need to be fetched again.
+    with pytest.raises(AssertionError):
+        access_handle.py__mro__()
+
+
 def test_error_in_environment(inference_state, Script, environment):
     if isinstance(environment, InterpreterEnvironment):
         pytest.skip("We don't catch these errors at the moment.")
@@ -152,3 +197,80 @@ def test_changing_venv(venv_path, monkeypatch):
     get_cached_default_environment()
     monkeypatch.setitem(os.environ, 'VIRTUAL_ENV', sys.executable)
     assert get_cached_default_environment().executable == sys.executable
+
+
+def test_subprocess_pool(environment, monkeypatch):
+    if isinstance(environment, InterpreterEnvironment):
+        pytest.skip("Does not use a subprocess")
+    from jedi.inference import InferenceState
+    monkeypatch.setattr(settings, 'compiled_subprocess_count', 2)
+
+    project = jedi.get_default_project()
+    first = InferenceState(project, environment=environment)
+    second = InferenceState(project, environment=environment)
+    third = InferenceState(project, environment=environment)
+    used = {
+        first.compiled_subprocess._compiled_subprocess,
+        second.compiled_subprocess._compiled_subprocess,
+    }
+    assert len(used) == 2
+    assert third.compiled_subprocess._compiled_subprocess in used
+
+    for inference_state in (first, second, third):
+        assert inference_state.compiled_subprocess.create_simple_object(1)
+
+
+def test_batched_inference_state_deletion(environment):
+    if isinstance(environment, InterpreterEnvironment):
+        pytest.skip("Does not use a subprocess")
+    from jedi.inference import InferenceState
+
+    project = jedi.get_default_project()
+    inference_state = InferenceState(project, environment=environment)
+    compiled_subprocess = inference_state.compiled_subprocess._compiled_subprocess
+    others = [InferenceState(project, environment=environment) for _ in range(3)]
+    for other in others:
+        other.compiled_subprocess.create_simple_object(1)
+        compiled_subprocess.delete_inference_state(id(other))
+
+    compiled_subprocess._delete_old_inference_states()
+    assert not compiled_subprocess._inference_state_deletion_queue
+    assert len(compiled_subprocess._deletion_requests) == 1
+
+    freed = compiled_subprocess.freed_access_handles
+    assert inference_state.compiled_subprocess.create_simple_object(1)
+    assert not compiled_subprocess._deletion_requests
+    assert compiled_subprocess.freed_access_handles >= freed + 3
+    assert not compiled_subprocess._pending_responses
+
+
+@pytest.mark.parametrize('transport', ['framed', 'socket'])
+def test_subprocess_transport(environment, monkeypatch, transport):
+    if isinstance(environment, InterpreterEnvironment):
+        pytest.skip("Does not use a subprocess")
+    from jedi.inference.compiled.subprocess import CompiledSubprocess
+    monkeypatch.setattr(settings, 'compiled_subprocess_transport', transport)
+
+    compiled_subprocess = CompiledSubprocess(environment._start_executable)
+    try:
+        # Encoded with marshal if the environment uses the same Python version
+        assert compiled_subprocess._send(None, int, ('3',)) == 3
+        # Pickled
+        error = compiled_subprocess._send(None, ValueError, ('foo',))
+        assert isinstance(error, ValueError)
+        with pytest.raises(ValueError):
+            compiled_subprocess._send(None, int, ('foo',))
+    finally:
+        compiled_subprocess._kill()
+
+
+@pytest.mark.parametrize('use_marshal, encoding', [(False, 1), (True, 0)])
+def test_framed_message_encoding(use_marshal, encoding):
+    from jedi.inference.compiled.subprocess import _write_message, _read_message, \
+        _FRAME_HEADER
+
+    file = BytesIO()
+    _write_message(file, (1, [(False, None, 'foo')]), True, use_marshal)
+    assert _FRAME_HEADER.unpack(file.getvalue()[:_FRAME_HEADER.size])[1] == encoding
+    file.seek(0)
+    assert _read_message(file, True) == (1, [(False, None, 'foo')])
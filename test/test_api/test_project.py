@@ -1,4 +1,6 @@
 import os
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
 import pytest
@@ -7,6 +9,8 @@ from ..helpers import get_example_dir, set_cwd, root_dir, test_dir
 from jedi import Interpreter
 from jedi.api import Project, get_default_project
 from jedi.api.project import _is_potential_project, _CONTAINS_POTENTIAL_PROJECT
+from jedi.inference import symbol_index
+from jedi.inference.symbol_index import SymbolIndex
 
 
 def test_django_default_project(Script):
@@ -167,6 +171,145 @@ def test_complete_search(Script, string, completions, all_scopes):
     assert [d.complete for d in defs] == completions
 
 
+def test_symbol_index(tmp_path, inference_state):
+    pkg = tmp_path.joinpath('pkg')
+    pkg.mkdir()
+    pkg.joinpath('__init__.py').write_text('import os\nclass Foo:\n    def bar(self): pass\n')
+    tmp_path.joinpath('mod.py').write_text('foo_var = 1\n')
+
+    index = SymbolIndex(tmp_path)
+    index.update(inference_state.grammar)
+    (path, foo, rank), = index.find('foo')
+    assert path == str(pkg.joinpath('__init__.py'))
+    assert foo == ('Foo', 'class', 'pkg.Foo', 2, 6, True)
+    assert rank == (0, 3)
+    assert not list(index.find('bar'))
+    assert [m.symbol.full_name for m in index.find('bar', all_scopes=True)] == ['pkg.Foo.bar']
+    (_, os_symbol, _), = index.find('os')
+    assert os_symbol.type == 'import'
+    assert sorted(m.symbol.name for m in index.find('fo', complete=True)) == ['Foo', 'foo_var']
+
+    # A new index loads the persisted one and only reparses changed files.
+    index._save_future.result()
+    tmp_path.joinpath('mod.py').write_text('# changed\nfoo_var = 1\n')
+    os.utime(tmp_path.joinpath('mod.py'), (0, 0))
+    index = SymbolIndex(tmp_path)
+    index.update(inference_state.grammar)
+    (_, foo_var, _), = index.find('foo_var')
+    assert foo_var.line == 2
+
+
+def test_search_reexports(tmp_path):
+    tmp_path.joinpath('defining.py').write_text('def foo_func(): pass\n')
+    tmp_path.joinpath('reexporting.py').write_text('import os\nfrom defining import foo_func\n')
+    project = Project(tmp_path)
+    defs = project.complete_search('foo_f')
+    assert sorted(d.module_name for d in defs) == ['defining', 'reexporting']
+    # Imported modules are not found.
+    assert 'reexporting' not in [d.module_name for d in project.search('os')]
+
+
+def test_symbol_index_incremental(tmp_path, inference_state):
+    mod = tmp_path.joinpath('mod.py')
+    mod.write_text('foo_var = 1\n')
+    index = SymbolIndex(tmp_path)
+    index.update(inference_state.grammar)
+    assert [m.symbol.name for m in index.find('foo', complete=True)] == ['foo_var']
+
+    # The project was just walked, only invalidated files are checked.
+    mod.write_text('foo_bar = 1\nfoo_baz = 1\n')
+    other = tmp_path.joinpath('other.py')
+    other.write_text('foo_other = 1\n')
+    index.update(inference_state.grammar)
+    assert [m.symbol.name for m in index.find('foo', complete=True)] == ['foo_var']
+
+    index.invalidate(mod)
+    index.update(inference_state.grammar)
+    assert [m.symbol.name for m in index.find('foo', complete=True)] == ['foo_bar', 'foo_baz']
+    assert index._sorted_names == ['foo_bar', 'foo_baz']
+    assert index.find_paths_containing('foo_var') == []
+    assert index.find_paths_containing('foo_bar') == [str(mod)]
+    assert index.count_paths_containing('foo_bar') == 1
+
+    # Deleted files are removed.
+    mod.unlink()
+    index.invalidate(mod)
+    index.update(inference_state.grammar)
+    assert not index.find('foo', complete=True)
+    assert index._names_by_character['f'] == set()
+
+
+def test_symbol_index_fuzzy_ranking(tmp_path, inference_state):
+    tmp_path.joinpath('mod.py').write_text('oa = 1\nfoobar = 1\nxooa = 1\nbar = 1\n')
+    index = SymbolIndex(tmp_path)
+    index.update(inference_state.grammar)
+    matches = index.find('oa', complete=True, fuzzy=True)
+    assert [m.symbol.name for m in matches] == ['oa', 'xooa', 'foobar']
+    assert [m.rank[0] for m in matches] == [0, 2, 3]
+    assert [m.symbol.name for m in index.find('', complete=True)] \
+        == ['oa', 'bar', 'xooa', 'foobar']
+
+
+def test_complete_search_ranking(tmp_path):
+    tmp_path.joinpath('a.py').write_text('xooa = 1\nfoobar = 1\n')
+    tmp_path.joinpath('b.py').write_text('oa = 1\nbar = 1\n')
+    defs = Project(tmp_path).complete_search('oa', fuzzy=True)
+    # The best matches of all files first, not file by file.
+    assert [d.name for d in defs][:3] == ['oa', 'xooa', 'foobar']
+
+
+def test_symbol_index_parallel(tmp_path, inference_state, monkeypatch):
+    for i in range(5):
+        tmp_path.joinpath('mod%s.py' % i).write_text('def func%s(): used_name\n' % i)
+
+    def get_symbols():
+        index = SymbolIndex(tmp_path)
+        index.update(inference_state.grammar)
+        return (
+            sorted(m.symbol.full_name for m in index.find('func', complete=True)),
+            sorted(index.find_paths_containing('used_name')),
+        )
+
+    serial = get_symbols()
+    assert len(serial[0]) == len(serial[1]) == 5
+
+    monkeypatch.setattr(symbol_index, '_PARALLEL_FILE_COUNT', 2)
+    monkeypatch.setattr(symbol_index, '_indexes', {})
+    for path in tmp_path.iterdir():
+        os.utime(path, (1, 1))
+    assert get_symbols() == serial
+
+    class BrokenExecutor:
+        def __init__(self):
+            self.submitted = 0
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+        def submit(self, func, *args):
+            # One file is indexed, one fails in the worker, then the pool
+            # breaks.
+            future = Future()
+            if self.submitted == 0:
+                future.set_result(func(*args))
+            elif self.submitted == 1:
+                future.set_result([None])
+            else:
+                future.set_exception(BrokenProcessPool())
+            self.submitted += 1
+            return future
+
+    monkeypatch.setattr(symbol_index, '_CHUNK_SIZE', 1)
+    monkeypatch.setattr(symbol_index, '_create_process_pool', BrokenExecutor)
+    monkeypatch.setattr(symbol_index, '_indexes', {})
+    for path in tmp_path.iterdir():
+        os.utime(path, (2, 2))
+    assert get_symbols() == serial
+
+
 @pytest.mark.parametrize(
     'path,expected', [
         (Path(__file__).parents[2], True), # The path of the project
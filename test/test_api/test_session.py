@@ -0,0 +1,141 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import jedi
+from jedi import Session, InterpreterEnvironment
+
+
+@pytest.fixture
+def session(environment, tmp_path):
+    return Session(jedi.Project(tmp_path), environment=environment)
+
+
+def test_session_reuses_inference_state(session, tmp_path):
+    path = tmp_path.joinpath('foo.py')
+    first = jedi.Script('import json; json.lo', path=path, session=session)
+    second = jedi.Script('import json; json.du', path=path, session=session)
+    assert first._inference_state is second._inference_state
+
+    assert [c.name for c in first.complete()] == ['load', 'loads']
+    assert [c.name for c in second.complete()] == ['dump', 'dumps']
+
+
+def test_session_invalidate(session, tmp_path):
+    module_path = tmp_path.joinpath('mod.py')
+    module_path.write_text('def foo(): pass\n')
+    path = tmp_path.joinpath('main.py')
+
+    script = jedi.Script('import mod; mod.f', path=path, session=session)
+    assert [c.name for c in script.complete()] == ['foo']
+
+    module_path.write_text('def far(): pass\n')
+    session.invalidate(module_path)
+    script = jedi.Script('import mod; mod.f', path=path, session=session)
+    assert [c.name for c in script.complete()] == ['far']
+
+
+def test_session_changing_script_path(session, tmp_path):
+    jedi.Script('import json', path=tmp_path.joinpath('a.py'), session=session).infer()
+    inference_state = session._inference_state
+    jedi.Script('import json', path=tmp_path.joinpath('b.py'), session=session).infer()
+    assert session._inference_state is inference_state
+    assert inference_state.script_path == tmp_path.joinpath('b.py')
+
+
+def test_session_clear(session):
+    jedi.Script('import json', session=session).infer()
+    session.clear()
+    assert session._inference_state is None
+
+
+def test_session_with_project_or_environment(session, environment):
+    with pytest.raises(ValueError):
+        jedi.Script('', session=session, project=session.project)
+    with pytest.raises(ValueError):
+        jedi.Script('', session=session, environment=environment)
+
+
+def test_interpreter_session():
+    session = Session(environment=InterpreterEnvironment())
+    script = jedi.Interpreter('x.upp', [{'x': 'a'}], session=session)
+    assert [c.name for c in script.complete()] == ['upper']
+
+    with pytest.raises(TypeError):
+        jedi.Interpreter('', [{}], session=Session())
+
+
+def test_session_threads(session, tmp_path):
+    def complete(i):
+        code = 'import json; json.lo' if i % 2 else 'import json; json.du'
+        path = tmp_path.joinpath('foo%s.py' % i)
+        return [c.name for c in jedi.Script(code, path=path, session=session).complete()]
+
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(complete, range(8)))
+    assert results == [['dump', 'dumps'], ['load', 'loads']] * 4
+
+
+def test_session_incremental_completion(session, tmp_path):
+    path = tmp_path.joinpath('foo.py')
+
+    def complete(code):
+        script = jedi.Script(code, path=path, session=session)
+        return [c.name for c in script.complete()]
+
+    assert complete('import json; json.l') == ['load', 'loads']
+    candidates = session._completion_candidates
+    assert candidates.like_name == 'l'
+    assert complete('import json; json.loads') == ['loads']
+    assert session._completion_candidates is candidates
+
+    # Deleting the first character of the name infers the names again.
+    assert 'dumps' in complete('import json; json.')
+    candidates = session._completion_candidates
+    assert candidates.like_name == ''
+    assert complete('import json; json.d') == ['dump', 'dumps']
+    assert session._completion_candidates is candidates
+
+    # Changing the code somewhere else infers the names again as well.
+    assert complete('import json\njson.d') == ['dump', 'dumps']
+    assert session._completion_candidates is not candidates
+
+    session.invalidate(path)
+    assert session._completion_candidates is None
+
+
+def test_session_same_sys_path_keeps_cache(session, tmp_path):
+    jedi.Script('import json', path=tmp_path.joinpath('a.py'), session=session).infer()
+    inference_state = session._inference_state
+    memoize_cache = dict(inference_state.memoize_cache)
+    assert memoize_cache
+    # Both scripts are in the project folder and have the same sys path.
+    jedi.Script('import json', path=tmp_path.joinpath('b.py'), session=session)
+    assert inference_state.memoize_cache.keys() >= memoize_cache.keys()
+
+
+def test_session_crashed_subprocess(session, tmp_path, monkeypatch):
+    jedi.Script('import json', session=session).infer()
+    inference_state = session._inference_state
+    monkeypatch.setattr(type(inference_state.compiled_subprocess), 'is_crashed', True)
+    script = jedi.Script('import json', session=session)
+    assert script._inference_state is not inference_state
+    monkeypatch.undo()
+    assert script.infer(1, 8)
+
+
+def test_session_threads_all_api_calls(session, tmp_path):
+    path = tmp_path.joinpath('foo.py')
+    code = 'import json\ndef foo(): return json.loads("")\nfoo().'
+
+    def run(i):
+        script = jedi.Script(code, path=path, session=session)
+        if i % 3 == 0:
+            return [n.name for n in script.get_names()]
+        if i % 3 == 1:
+            return [n.name for n in script.search('foo')]
+        return bool(script.complete())
+
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(run, range(9)))
+    assert results == [['json', 'foo'], ['foo'], True] * 3
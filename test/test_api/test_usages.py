@@ -62,3 +62,98 @@ foo()
 
     for place in places:
         assert places == [(n.line, n.column) for n in script.get_references(scope='file', *place)]
+
+
+def test_references_in_many_files(Script, tmp_path):
+    from jedi.api.project import Project
+    tmp_path.joinpath('defining.py').write_text('def very_unique_name(): pass\n')
+    for i in range(50):
+        tmp_path.joinpath('using%s.py' % i).write_text(
+            'from defining import very_unique_name\nvery_unique_name()\n'
+        )
+    tmp_path.joinpath('other.py').write_text('x = 1\n')
+
+    project = Project(tmp_path)
+    script = Script(path=tmp_path.joinpath('defining.py'), project=project)
+    references = script.get_references(1, 4)
+    assert {r.module_path.name for r in references} \
+        == {'defining.py'} | {'using%s.py' % i for i in range(50)}
+    assert len(references) == 1 + 50 * 2
+
+
+def test_references_outside_of_project(Script, tmp_path):
+    from jedi.api.project import Project
+    tmp_path.joinpath('using.py').write_text('import json\njson.dumps()\n')
+    # Neither the script nor json live in the project.
+    script = Script('import json\njson.dumps', project=Project(tmp_path))
+    references = script.get_references(2, 6)
+    assert tmp_path.joinpath('using.py') in [r.module_path for r in references]
+
+
+def test_limited_module_search_for_inference(Script, tmp_path, monkeypatch):
+    from jedi.api.project import Project
+    from jedi.inference import references
+    for i in range(5):
+        tmp_path.joinpath('using%s.py' % i).write_text('very_unique_name()\n')
+    monkeypatch.setattr(references, '_PARSED_FILE_LIMIT', 2)
+
+    project = Project(tmp_path)
+    script = Script('', path=tmp_path.joinpath('main.py'), project=project)
+    module_context = script._get_module_context()
+    inference_state = script._inference_state
+    # Used by dynamic params, only a few files are parsed.
+    found = list(references.get_module_contexts_containing_name(
+        inference_state, [module_context], 'very_unique_name'))
+    assert len(found) == 1 + 2
+    found = list(references.iter_module_contexts_containing_name(
+        inference_state, [module_context], 'very_unique_name'))
+    assert len(found) == 1 + 5
+
+
+def test_iter_references(Script, tmp_path):
+    from jedi.api.project import Project
+    tmp_path.joinpath('defining.py').write_text('def very_unique_name(): pass\n')
+    for i in range(3):
+        tmp_path.joinpath('using%s.py' % i).write_text(
+            'from defining import very_unique_name\nvery_unique_name()\n'
+        )
+    project = Project(tmp_path)
+    script = Script(path=tmp_path.joinpath('defining.py'), project=project)
+
+    references = script.get_references(1, 4)
+    iterator = script.iter_references(1, 4)
+    assert next(iterator).module_path.name == 'defining.py'
+    assert sorted(n.module_path for n in iterator) \
+        == sorted(n.module_path for n in references[1:])
+
+    # Only the names of the module itself are found before stopping.
+    stopped = list(script.iter_references(1, 4, should_stop=lambda: True))
+    assert [n.module_path.name for n in stopped] == ['defining.py']
+
+
+def test_iter_references_releases_lock(Script, tmp_path):
+    from threading import Thread
+    from jedi.api.project import Project
+    tmp_path.joinpath('defining.py').write_text('def very_unique_name(): pass\n')
+    tmp_path.joinpath('using.py').write_text(
+        'from defining import very_unique_name\nvery_unique_name()\n'
+    )
+    script = Script(path=tmp_path.joinpath('defining.py'), project=Project(tmp_path))
+    iterator = script.iter_references(1, 4)
+    assert next(iterator).module_path.name == 'defining.py'
+
+    # Other threads can use the inference state while the consumer handles
+    # the references.
+    acquired = []
+
+    def acquire():
+        lock = script._inference_state.lock
+        if lock.acquire(timeout=5):
+            lock.release()
+            acquired.append(True)
+
+    thread = Thread(target=acquire)
+    thread.start()
+    thread.join()
+    assert acquired == [True]
+    assert [n.module_path.name for n in iterator] == ['using.py', 'using.py']
@@ -1,6 +1,7 @@
 """
 Test all things related to the ``jedi.cache`` module.
 """
+import jedi
 
 
 def test_cache_get_signatures(Script):
@@ -27,3 +28,57 @@ def test_cache_get_signatures(Script):
 def test_cache_line_split_issues(Script):
     """Should still work even if there's a newline."""
     assert Script('int(\n').get_signatures()[0].name == 'int'
+
+
+def test_memoize_cache_invalidation(environment, tmp_path):
+    a_path = tmp_path.joinpath('mod_a.py')
+    a_path.write_text('def foo(): return 1\n')
+    b_path = tmp_path.joinpath('mod_b.py')
+    b_path.write_text('def bar(): return ""\n')
+
+    session = jedi.Session(jedi.Project(tmp_path), environment=environment)
+    script = jedi.Script(
+        'import mod_a, mod_b\nmod_a.foo(); mod_b.bar()',
+        path=tmp_path.joinpath('main.py'),
+        session=session,
+    )
+    assert script.infer(2, len('mod_a.foo()'))[0].name == 'int'
+    assert script.infer(2, len('mod_a.foo(); mod_b.bar()'))[0].name == 'str'
+
+    inference_state = session._inference_state
+    assert inference_state.memoize_dependencies[a_path]
+    b_entries = set(inference_state.memoize_dependencies[b_path])
+    assert b_entries
+
+    session.invalidate(a_path)
+    assert a_path not in inference_state.memoize_dependencies
+    # Results that only depend on mod_b are still cached.
+    remaining = inference_state.memoize_dependencies[b_path]
+    assert remaining
+    for function, key in remaining:
+        assert key in inference_state.memoize_cache[function]
+
+
+def test_inference_cache_limit(environment, monkeypatch):
+    session = jedi.Session(environment=environment)
+    assert session.get_cache_sizes() == {}
+
+    jedi.Script('import json; json.loads("").', session=session).complete()
+    sizes = session.get_cache_sizes()
+    assert set(sizes) == {'memoize', 'module', 'stub_module', 'compiled', 'mixed', 'access'}
+    assert sizes['memoize'] > 100
+
+    monkeypatch.setattr(jedi.settings, 'inference_cache_limit', 100)
+    script = jedi.Script('import json; json.lo', session=session)
+    inference_state = session._inference_state
+    with inference_state.api_call():
+        assert sum(session.get_cache_sizes().values()) <= 100
+    # Evicted results are inferred again.
+    assert [c.name for c in script.complete()] == ['load', 'loads']
+
+
+def test_parser_locks(tmp_path):
+    from jedi.cache import get_parser_lock
+    path = tmp_path.joinpath('foo.py')
+    assert get_parser_lock(path) is get_parser_lock(str(path))
+    assert get_parser_lock(path) is not get_parser_lock(tmp_path.joinpath('bar.py'))
@@ -171,3 +171,42 @@ def test_operation(Script, inference_state, create_compiled_object):
     )
     assert false.py__name__() == 'bool'
     assert true.py__name__() == 'bool'
+
+
+def test_member_snapshot(inference_state, create_compiled_object):
+    class Foo:
+        """doc"""
+        def method(self, a, b=3):
+            """method doc"""
+
+        @property
+        def prop(self):
+            raise NotImplementedError
+
+    foo = create_compiled_object(Foo)
+    needs_type_completions, members = foo.get_member_snapshot()
+    assert needs_type_completions
+    assert members['method'].api_type == 'function'
+    assert members['prop'].is_descriptor
+    assert foo.get_member_snapshot() is foo.get_member_snapshot()
+
+    names = {n.string_name: n for f in foo.get_filters() for n in f.values()}
+    assert names['method'].api_type == 'function'
+    assert names['__init__'].api_type == 'function'
+
+
+def test_prefetch_docstrings(inference_state, create_compiled_object):
+    class Foo:
+        def method(self):
+            """method doc"""
+
+        @property
+        def prop(self):
+            raise NotImplementedError
+
+    foo = create_compiled_object(Foo)
+    names = {n.string_name: n for f in foo.get_filters() for n in f.values()}
+    compiled.value.prefetch_docstrings(names.values())
+    assert foo._member_docstrings['method'] == 'method doc'
+    assert 'prop' not in foo._member_docstrings
+    assert names['method'].py__doc__() == 'method doc'
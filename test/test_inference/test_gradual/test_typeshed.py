@@ -1,9 +1,11 @@
 import os
 
 import pytest
+from parso.cache import parser_cache
 from parso.utils import PythonVersionInfo
 
-from jedi.inference.gradual import typeshed
+from jedi.file_io import FileIO
+from jedi.inference.gradual import typeshed, typeshed_index
 from jedi.inference.value import TreeInstance, BoundMethod, FunctionValue, \
     MethodValue, ClassValue
 from jedi.inference.names import StubName
@@ -32,6 +34,35 @@ def test_get_stub_files():
     assert map_['functools'].path == os.path.join(TYPESHED_PYTHON3, 'functools.pyi')
 
 
+def test_typeshed_index(tmp_path, monkeypatch):
+    index_path = tmp_path.joinpath(typeshed_index.INDEX_NAME)
+    typeshed_index.write_index(typeshed.TYPESHED_PATH, index_path)
+    index = typeshed_index.load_index(index_path)
+    assert index['stdlib/3']['functools'] == 'functools.pyi'
+
+    path_info = typeshed.PathInfo(TYPESHED_PYTHON3, is_third_party=False)
+    without_index = typeshed._create_stub_map(path_info)
+    monkeypatch.setattr(typeshed, '_index', index)
+    monkeypatch.setattr(os, 'listdir', None)
+    assert typeshed._create_stub_map(path_info) == without_index
+    assert len(list(typeshed._get_typeshed_directories(PythonVersionInfo(3, 7)))) == 6
+
+
+def test_typeshed_tree_cache(tmp_path, monkeypatch, inference_state):
+    cache_path = tmp_path.joinpath(typeshed_index.TREE_CACHE_NAME)
+    typeshed_index.write_tree_cache(typeshed.TYPESHED_PATH.parent, cache_path)
+    grammar = inference_state.latest_grammar
+    trees = typeshed_index.load_tree_cache(cache_path, grammar)
+    assert 'typeshed/stdlib/2and3/builtins.pyi' in trees
+
+    path = typeshed.TYPESHED_PATH.joinpath('stdlib', '2and3', 'builtins.pyi')
+    monkeypatch.setattr(typeshed, '_tree_cache', trees)
+    monkeypatch.setitem(parser_cache, grammar._hashed, {})
+    module = typeshed.parse_stub_module(inference_state, FileIO(path))
+    assert module.get_code() == path.read_text()
+    assert parser_cache[grammar._hashed][path].node is module
+
+
 def test_function(Script, environment):
     code = 'import threading; threading.current_thread'
     def_, = Script(code).infer()